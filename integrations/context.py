@@ -19,28 +19,68 @@ from config import CONTEXT_DIR, STATE_DIR
 
 JOURNAL_DIR = STATE_DIR / "journal"
 
+# Bytes read from the end of a journal file when looking for its last entry
+TAIL_BYTES = 4096
+
 
 def ensure_dirs():
     CONTEXT_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _read_last_entry(path: Path) -> dict | None:
+    """Read the last entry of a journal file without parsing the whole day.
+
+    Days are JSONL, so the last entry is the last line; only the tail of the
+    file is read unless that line is longer than TAIL_BYTES. Old-format
+    <date>.json days are JSON arrays written with indent=2, where every
+    top-level entry starts with a "\n  {" line; they fall back to a full
+    read if the tail doesn't parse.
+    """
+    with open(path, "rb") as fh:
+        size = fh.seek(0, 2)
+        offset = max(0, size - TAIL_BYTES)
+        fh.seek(offset)
+        tail = fh.read().rstrip()
+
+    if path.suffix == ".jsonl":
+        if offset and b"\n" not in tail:
+            # The tail starts mid-way through the last line
+            tail = path.read_bytes().rstrip()
+        return json.loads(tail.rsplit(b"\n", 1)[-1]) if tail else None
+
+    if tail.endswith(b"]"):
+        start = tail.rfind(b"\n  {")
+        if start != -1:
+            try:
+                return json.loads(tail[start:-1])
+            except json.JSONDecodeError:
+                pass
+
+    entries = json.loads(path.read_text())
+    return entries[-1] if entries else None
+
+
 def get_last_journal_entry() -> dict | None:
     """Get the most recent journal entry across all days."""
     if not JOURNAL_DIR.exists():
         return None
 
-    # Get all journal files, sorted by date descending
-    files = sorted(JOURNAL_DIR.glob("*.json"), reverse=True)
+    # Filenames are YYYY-MM-DD, so a stem sort is a date sort. Days are
+    # <date>.jsonl; <date>.json is the old format, until journal.py migrates it
+    files = sorted(
+        [*JOURNAL_DIR.glob("*.jsonl"), *JOURNAL_DIR.glob("*.json")],
+        key=lambda f: f.stem,
+        reverse=True,
+    )
 
     for f in files:
         try:
-            entries = json.loads(f.read_text())
-            if entries:
+            entry = _read_last_entry(f)
+            if entry:
                 # Return the last entry from the most recent non-empty day
-                entry = entries[-1]
                 entry["_date"] = f.stem  # Add the date from filename
                 return entry
-        except:
+        except (OSError, json.JSONDecodeError):
             continue
 
     return None
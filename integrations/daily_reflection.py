@@ -26,6 +26,12 @@ from utils import run_claude as _run_claude, log_to_file
 LOG_FILE = STATE_DIR / "daily_reflection.log"
 REFLECTION_STATE = STATE_DIR / "daily_reflection_state.json"
 
+# Timeout (seconds) for helper integration scripts
+HELPER_TIMEOUT = 30
+
+# Characters of each vault note kept for context
+NOTE_CHARS = 1000
+
 
 def log(message: str):
     log_to_file(LOG_FILE, message)
@@ -71,13 +77,16 @@ def get_vault_notes() -> list[dict]:
         try:
             mtime = datetime.fromtimestamp(md_file.stat().st_mtime)
             if mtime > cutoff:
-                content = md_file.read_text()
+                # Only read the head of the note - UTF-8 is at most 4 bytes/char
+                with open(md_file, "rb") as fh:
+                    head = fh.read(NOTE_CHARS * 4)
+                content = head.decode("utf-8", errors="ignore")
                 notes.append({
                     "name": md_file.stem,
-                    "content": content[:1000],  # Truncate for context
+                    "content": content[:NOTE_CHARS],  # Truncate for context
                     "modified": mtime.isoformat()
                 })
-        except Exception:
+        except (OSError, UnicodeDecodeError):
             continue
 
     return sorted(notes, key=lambda x: x["modified"], reverse=True)
@@ -90,12 +99,16 @@ def get_recent_activity() -> list[dict]:
             ["python3", str(INTEGRATIONS / "activity.py"), "recent", "50"],
             capture_output=True,
             text=True,
-            cwd=str(WORKSPACE)
+            cwd=str(WORKSPACE),
+            timeout=HELPER_TIMEOUT
         )
         if result.returncode == 0:
             data = json.loads(result.stdout)
             return data.get("entries", [])
-    except Exception:
+    except subprocess.TimeoutExpired:
+        log("activity.py recent timed out")
+        return []
+    except (OSError, json.JSONDecodeError):
         pass
     return []
 
@@ -107,12 +120,16 @@ def get_journal_entries() -> list[dict]:
             ["python3", str(INTEGRATIONS / "journal.py"), "week"],
             capture_output=True,
             text=True,
-            cwd=str(WORKSPACE)
+            cwd=str(WORKSPACE),
+            timeout=HELPER_TIMEOUT
         )
         if result.returncode == 0:
             data = json.loads(result.stdout)
             return data.get("entries", [])
-    except Exception:
+    except subprocess.TimeoutExpired:
+        log("journal.py week timed out")
+        return []
+    except (OSError, json.JSONDecodeError):
         pass
     return []
 
@@ -124,13 +141,17 @@ def get_research_threads_summary() -> str:
             ["python3", str(INTEGRATIONS / "research_spawner.py"), "list"],
             capture_output=True,
             text=True,
-            cwd=str(WORKSPACE)
+            cwd=str(WORKSPACE),
+            timeout=HELPER_TIMEOUT
         )
         if result.returncode == 0:
             data = json.loads(result.stdout)
             threads = data.get("spawned_threads", [])[-5:]
             return "\n".join([f"- {t.get('topic', 'Unknown')}" for t in threads])
-    except Exception:
+    except subprocess.TimeoutExpired:
+        log("research_spawner.py list timed out")
+        return "(no recent threads)"
+    except (OSError, json.JSONDecodeError):
         pass
     return "(no recent threads)"
 
@@ -148,7 +169,8 @@ def post_reflection(content: str) -> dict:
             ],
             capture_output=True,
             text=True,
-            cwd=str(WORKSPACE)
+            cwd=str(WORKSPACE),
+            timeout=HELPER_TIMEOUT
         )
         if result.returncode == 0:
             data = json.loads(result.stdout)
@@ -161,6 +183,8 @@ def post_reflection(content: str) -> dict:
                 }
             return {"error": data.get("error", "Unknown error")}
         return {"error": result.stderr or "Failed to queue message"}
+    except subprocess.TimeoutExpired:
+        return {"error": "channel_message.py timed out"}
     except Exception as e:
         return {"error": str(e)}
 
@@ -343,10 +367,13 @@ Write only the reflection text, ready to post directly to Discord."""
 
     # Log activity
     activity_msg = "Saved daily reflection to vault" if vault_only else "Posted daily reflection to #reflections and saved to vault"
-    subprocess.run([
-        "python3", str(INTEGRATIONS / "activity.py"), "log", "task",
-        activity_msg
-    ], cwd=str(WORKSPACE))
+    try:
+        subprocess.run([
+            "python3", str(INTEGRATIONS / "activity.py"), "log", "task",
+            activity_msg
+        ], cwd=str(WORKSPACE), timeout=HELPER_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        log("activity.py log timed out")
 
 
 def get_status() -> dict:
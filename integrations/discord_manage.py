@@ -1,219 +1,318 @@
 #!/usr/bin/env python3
-"""Discord server management integration for Iris."""
+"""Discord server management integration for Iris.
+
+Talks to the Discord REST API directly instead of connecting a gateway
+client - management commands only need one or two HTTP requests each.
+
+Usage:
+    python discord_manage.py list <guild_id>
+    python discord_manage.py create <guild_id> <name> [--category NAME] [--type text|voice]
+    python discord_manage.py category <guild_id> <name>
+    python discord_manage.py delete <guild_id> <name>
+    python discord_manage.py rename <channel_id> <new_name>
+    python discord_manage.py batch [--file ops.json]   # ops: [{"op": "create", ...}, ...]
+"""
 
 import argparse
 import asyncio
 import json
-import os
 import sys
+import time
 from pathlib import Path
 
-import discord
+import discord_rest
+from config import STATE_DIR
+from discord_rest import (
+    CHANNEL_CATEGORY, CHANNEL_TEXT, CHANNEL_TYPES, CHANNEL_VOICE,
+    DISCORD_TOKEN, DiscordAPIError, request as _request
+)
+
+# Guild channel listings, persisted so name lookups survive across CLI runs
+CHANNEL_CACHE_FILE = STATE_DIR / "discord_channel_cache.json"
+CHANNEL_CACHE_TTL = 60  # seconds
+
+_channel_cache: dict | None = None
+_channel_cache_dirty = False
+
+
+async def close_session():
+    """Persist the channel cache and close the REST session."""
+    _flush_channel_cache()
+    await discord_rest.close_session()
 
-DISCORD_TOKEN = os.environ.get("DISCORD_TOKEN")
+
+def _load_channel_cache() -> dict:
+    """Load cached channel listings ({guild_id: {fetched, channels}})."""
+    global _channel_cache
+    if _channel_cache is None:
+        _channel_cache = {}
+        if CHANNEL_CACHE_FILE.exists():
+            try:
+                _channel_cache = json.loads(CHANNEL_CACHE_FILE.read_text())
+            except (OSError, json.JSONDecodeError):
+                pass
+    return _channel_cache
+
+
+def _save_channel_cache():
+    """Mark cached channel listings for writing when the session closes."""
+    global _channel_cache_dirty
+    _channel_cache_dirty = True
+
+
+def _flush_channel_cache():
+    """Persist cached channel listings if they changed."""
+    global _channel_cache_dirty
+    if not _channel_cache_dirty:
+        return
+    try:
+        CHANNEL_CACHE_FILE.write_text(json.dumps(_load_channel_cache()))
+    except OSError:
+        pass
+    _channel_cache_dirty = False
+
+
+def _cache_channels(guild_id: int, channels: list[dict]):
+    """Replace the cached listing for a guild."""
+    _load_channel_cache()[str(guild_id)] = {"fetched": time.time(), "channels": channels}
+    _save_channel_cache()
+
+
+def _update_cached_channels(guild_id: int, add: dict = None, remove: str = None):
+    """Apply a create/delete/rename to a guild's cached listing in place."""
+    entry = _load_channel_cache().get(str(guild_id))
+    if not entry:
+        return
+    channels = entry["channels"]
+    if remove is not None:
+        channels[:] = [c for c in channels if c["id"] != remove]
+    if add is not None:
+        channels[:] = [c for c in channels if c["id"] != add["id"]]
+        channels.append(add)
+    _save_channel_cache()
+
+
+def _invalidate_channels(guild_id: int):
+    """Drop a guild's cached listing."""
+    if _load_channel_cache().pop(str(guild_id), None) is not None:
+        _save_channel_cache()
+
+
+async def _get_channels(guild_id: int, refresh: bool = False) -> list[dict]:
+    """Get a guild's channels, using the cached listing if it's fresh."""
+    entry = _load_channel_cache().get(str(guild_id))
+    if not refresh and entry and time.time() - entry["fetched"] < CHANNEL_CACHE_TTL:
+        return entry["channels"]
+    channels = await _request("GET", f"/guilds/{guild_id}/channels")
+    _cache_channels(guild_id, channels)
+    return channels
 
 
 async def create_channel(guild_id: int, name: str, category: str = None, channel_type: str = "text") -> dict:
     """Create a channel in a guild."""
-    intents = discord.Intents.default()
-    intents.guilds = True
-    client = discord.Client(intents=intents)
-    result = {}
-
-    @client.event
-    async def on_ready():
-        nonlocal result
-        try:
-            try:
-                guild = await client.fetch_guild(guild_id)
-            except discord.NotFound:
-                result = {"error": f"Guild {guild_id} not found"}
-                await client.close()
-                return
-
-            # Find category if specified
-            category_obj = None
-            if category:
-                fetched_channels = await guild.fetch_channels()
-                for cat in [c for c in fetched_channels if isinstance(c, discord.CategoryChannel)]:
-                    if cat.name.lower() == category.lower():
-                        category_obj = cat
-                        break
-                if not category_obj:
-                    # Create the category
-                    category_obj = await guild.create_category(category)
-
-            # Create channel
-            if channel_type == "voice":
-                channel = await guild.create_voice_channel(name, category=category_obj)
-            else:
-                channel = await guild.create_text_channel(name, category=category_obj)
-
-            result = {
-                "success": True,
-                "channel_id": channel.id,
-                "channel_name": channel.name,
-                "category": category_obj.name if category_obj else None
+    try:
+        # Find category if specified
+        category_obj = None
+        if category:
+            fetched_channels = await _get_channels(guild_id)
+            categories = {
+                c["name"].casefold(): c
+                for c in reversed(fetched_channels) if c["type"] == CHANNEL_CATEGORY
             }
-        except discord.Forbidden:
-            result = {"error": "Missing permissions to create channel"}
-        except Exception as e:
-            result = {"error": str(e)}
-        finally:
-            await client.close()
-
-    await client.start(DISCORD_TOKEN)
-    return result
+            category_obj = categories.get(category.casefold())
+            if not category_obj:
+                # Create the category
+                category_obj = await _request(
+                    "POST", f"/guilds/{guild_id}/channels",
+                    {"name": category, "type": CHANNEL_CATEGORY}
+                )
+                _update_cached_channels(guild_id, add=category_obj)
+
+        # Create channel
+        payload = {
+            "name": name,
+            "type": CHANNEL_VOICE if channel_type == "voice" else CHANNEL_TEXT
+        }
+        if category_obj:
+            payload["parent_id"] = category_obj["id"]
+        channel = await _request("POST", f"/guilds/{guild_id}/channels", payload)
+        _update_cached_channels(guild_id, add=channel)
+
+        return {
+            "success": True,
+            "channel_id": int(channel["id"]),
+            "channel_name": channel["name"],
+            "category": category_obj["name"] if category_obj else None
+        }
+    except DiscordAPIError as e:
+        if e.status == 404:
+            return {"error": f"Guild {guild_id} not found"}
+        if e.status == 403:
+            return {"error": "Missing permissions to create channel"}
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": str(e)}
 
 
 async def list_channels(guild_id: int) -> dict:
     """List all channels in a guild."""
-    intents = discord.Intents.default()
-    intents.guilds = True
-    client = discord.Client(intents=intents)
-    result = {}
-
-    @client.event
-    async def on_ready():
-        nonlocal result
-        try:
-            try:
-                guild = await client.fetch_guild(guild_id)
-            except discord.NotFound:
-                result = {"error": f"Guild {guild_id} not found"}
-                await client.close()
-                return
-
-            channels = []
-            fetched_channels = await guild.fetch_channels()
-            for channel in fetched_channels:
-                channels.append({
-                    "id": channel.id,
-                    "name": channel.name,
-                    "type": str(channel.type),
-                    "category": channel.category.name if channel.category else None
-                })
-
-            result = {"success": True, "channels": channels}
-        except Exception as e:
-            result = {"error": str(e)}
-        finally:
-            await client.close()
-
-    await client.start(DISCORD_TOKEN)
-    return result
+    try:
+        fetched_channels = await _get_channels(guild_id, refresh=True)
+        names = {c["id"]: c["name"] for c in fetched_channels}
+
+        channels = []
+        for channel in fetched_channels:
+            channels.append({
+                "id": int(channel["id"]),
+                "name": channel["name"],
+                "type": CHANNEL_TYPES.get(channel["type"], str(channel["type"])),
+                "category": names.get(channel.get("parent_id"))
+            })
+
+        return {"success": True, "channels": channels}
+    except DiscordAPIError as e:
+        if e.status == 404:
+            return {"error": f"Guild {guild_id} not found"}
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": str(e)}
 
 
 async def create_category(guild_id: int, name: str) -> dict:
     """Create a category in a guild."""
-    intents = discord.Intents.default()
-    intents.guilds = True
-    client = discord.Client(intents=intents)
-    result = {}
-
-    @client.event
-    async def on_ready():
-        nonlocal result
-        try:
-            try:
-                guild = await client.fetch_guild(guild_id)
-            except discord.NotFound:
-                result = {"error": f"Guild {guild_id} not found"}
-                await client.close()
-                return
-
-            category = await guild.create_category(name)
-            result = {
-                "success": True,
-                "category_id": category.id,
-                "category_name": category.name
-            }
-        except discord.Forbidden:
-            result = {"error": "Missing permissions to create category"}
-        except Exception as e:
-            result = {"error": str(e)}
-        finally:
-            await client.close()
-
-    await client.start(DISCORD_TOKEN)
-    return result
+    try:
+        category = await _request(
+            "POST", f"/guilds/{guild_id}/channels",
+            {"name": name, "type": CHANNEL_CATEGORY}
+        )
+        _update_cached_channels(guild_id, add=category)
+        return {
+            "success": True,
+            "category_id": int(category["id"]),
+            "category_name": category["name"]
+        }
+    except DiscordAPIError as e:
+        if e.status == 404:
+            return {"error": f"Guild {guild_id} not found"}
+        if e.status == 403:
+            return {"error": "Missing permissions to create category"}
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": str(e)}
 
 
 async def delete_channel(guild_id: int, channel_name: str) -> dict:
     """Delete a channel by name."""
-    intents = discord.Intents.default()
-    intents.guilds = True
-    client = discord.Client(intents=intents)
-    result = {}
-
-    @client.event
-    async def on_ready():
-        nonlocal result
+    try:
+        # Find channel by name, refetching once if the cached listing misses
+        channel = None
+        for refresh in (False, True):
+            fetched_channels = await _get_channels(guild_id, refresh=refresh)
+            by_name = {ch["name"].casefold(): ch for ch in reversed(fetched_channels)}
+            channel = by_name.get(channel_name.casefold())
+            if channel:
+                break
+
+        if not channel:
+            return {"error": f"Channel '{channel_name}' not found"}
+
         try:
-            try:
-                guild = await client.fetch_guild(guild_id)
-            except discord.NotFound:
-                result = {"error": f"Guild {guild_id} not found"}
-                await client.close()
-                return
-
-            # Find channel by name
-            channel = None
-            fetched_channels = await guild.fetch_channels()
-            for ch in fetched_channels:
-                if ch.name.lower() == channel_name.lower():
-                    channel = ch
-                    break
-
-            if not channel:
-                result = {"error": f"Channel '{channel_name}' not found"}
-                await client.close()
-                return
-
-            await channel.delete()
-            result = {"success": True, "deleted": channel_name}
-        except discord.Forbidden:
-            result = {"error": "Missing permissions to delete channel"}
-        except Exception as e:
-            result = {"error": str(e)}
-        finally:
-            await client.close()
-
-    await client.start(DISCORD_TOKEN)
-    return result
+            await _request("DELETE", f"/channels/{channel['id']}")
+        except DiscordAPIError as e:
+            if e.status == 404:
+                # Already deleted elsewhere - the cached listing was stale
+                _update_cached_channels(guild_id, remove=channel["id"])
+                return {"error": f"Channel '{channel_name}' not found"}
+            raise
+        _update_cached_channels(guild_id, remove=channel["id"])
+        return {"success": True, "deleted": channel_name}
+    except DiscordAPIError as e:
+        # The cached listing may be stale (channel deleted elsewhere)
+        _invalidate_channels(guild_id)
+        if e.status == 404:
+            return {"error": f"Guild {guild_id} not found"}
+        if e.status == 403:
+            return {"error": "Missing permissions to delete channel"}
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": str(e)}
 
 
 async def rename_channel(channel_id: int, new_name: str) -> dict:
     """Rename a channel by ID."""
-    intents = discord.Intents.default()
-    intents.guilds = True
-    client = discord.Client(intents=intents)
-    result = {}
-
-    @client.event
-    async def on_ready():
-        nonlocal result
-        try:
-            channel = await client.fetch_channel(channel_id)
-            old_name = channel.name
-            await channel.edit(name=new_name)
-            result = {
-                "success": True,
-                "channel_id": channel_id,
-                "old_name": old_name,
-                "new_name": new_name
-            }
-        except discord.NotFound:
-            result = {"error": f"Channel {channel_id} not found"}
-        except discord.Forbidden:
-            result = {"error": "Missing permissions to rename channel"}
-        except Exception as e:
-            result = {"error": str(e)}
-        finally:
-            await client.close()
-
-    await client.start(DISCORD_TOKEN)
-    return result
+    try:
+        channel = await _request("GET", f"/channels/{channel_id}")
+        old_name = channel["name"]
+        renamed = await _request("PATCH", f"/channels/{channel_id}", {"name": new_name})
+        if channel.get("guild_id"):
+            _update_cached_channels(int(channel["guild_id"]), add=renamed)
+        return {
+            "success": True,
+            "channel_id": channel_id,
+            "old_name": old_name,
+            "new_name": new_name
+        }
+    except DiscordAPIError as e:
+        if e.status == 404:
+            return {"error": f"Channel {channel_id} not found"}
+        if e.status == 403:
+            return {"error": "Missing permissions to rename channel"}
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def run_op(op: dict) -> dict:
+    """Run one management operation.
+
+    The op dict uses the CLI's names, e.g.
+    {"op": "create", "guild_id": 123, "name": "general", "category": "Text"}.
+    """
+    if not isinstance(op, dict):
+        return {"error": f"Invalid op: expected an object, got {type(op).__name__}"}
+    command = op.get("op")
+    try:
+        if command == "list":
+            return await list_channels(int(op["guild_id"]))
+        elif command == "create":
+            return await create_channel(
+                int(op["guild_id"]), op["name"], op.get("category"), op.get("type", "text")
+            )
+        elif command == "category":
+            return await create_category(int(op["guild_id"]), op["name"])
+        elif command == "delete":
+            return await delete_channel(int(op["guild_id"]), op["name"])
+        elif command == "rename":
+            return await rename_channel(int(op["channel_id"]), op["new_name"])
+    except (KeyError, TypeError, ValueError) as e:
+        return {"error": f"Invalid {command} op: {e}"}
+    return {"error": f"Unknown op: {command}"}
+
+
+async def run_batch(ops: list[dict]) -> dict:
+    """Run several operations over one session.
+
+    Ops run in order rather than concurrently - later ops often depend on
+    earlier ones (e.g. channels going into a category created just before).
+    """
+    if not isinstance(ops, list):
+        return {"error": f"Batch must be a JSON list of ops, got {type(ops).__name__}"}
+    try:
+        results = [await run_op(op) for op in ops]
+    finally:
+        await close_session()
+    return {
+        "success": all(r.get("success") for r in results),
+        "results": results
+    }
+
+
+async def run_command(args) -> dict:
+    """Run a single CLI command and close the session afterwards."""
+    try:
+        return await run_op({"op": args.command, **vars(args)})
+    finally:
+        await close_session()
 
 
 def main():
@@ -246,22 +345,25 @@ def main():
     rename_parser.add_argument("channel_id", type=int, help="Channel ID")
     rename_parser.add_argument("new_name", help="New channel name")
 
+    # Batch of operations
+    batch_parser = subparsers.add_parser("batch", help="Run a JSON list of operations")
+    batch_parser.add_argument("--file", help="JSON file of ops (default: stdin)")
+
     args = parser.parse_args()
 
     if not DISCORD_TOKEN:
         print(json.dumps({"error": "DISCORD_TOKEN not set"}))
         sys.exit(1)
 
-    if args.command == "list":
-        result = asyncio.run(list_channels(args.guild_id))
-    elif args.command == "create":
-        result = asyncio.run(create_channel(args.guild_id, args.name, args.category, args.type))
-    elif args.command == "category":
-        result = asyncio.run(create_category(args.guild_id, args.name))
-    elif args.command == "delete":
-        result = asyncio.run(delete_channel(args.guild_id, args.name))
-    elif args.command == "rename":
-        result = asyncio.run(rename_channel(args.channel_id, args.new_name))
+    if args.command == "batch":
+        try:
+            ops = json.loads(Path(args.file).read_text() if args.file else sys.stdin.read())
+        except (OSError, json.JSONDecodeError) as e:
+            print(json.dumps({"error": f"Could not read ops: {e}"}))
+            sys.exit(1)
+        result = asyncio.run(run_batch(ops))
+    else:
+        result = asyncio.run(run_command(args))
 
     print(json.dumps(result, indent=2))
 
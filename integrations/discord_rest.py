@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Minimal Discord REST client for Iris integrations.
+
+For scripts that only need a few API calls - no gateway connection, no
+discord.py import. All requests in a process share one keep-alive session.
+"""
+
+import asyncio
+import os
+
+import aiohttp
+
+DISCORD_TOKEN = os.environ.get("DISCORD_TOKEN")
+API_BASE = "https://discord.com/api/v10"
+REQUEST_TIMEOUT = 30  # seconds
+
+# Discord channel type ids -> names (matching discord.py's ChannelType)
+CHANNEL_TEXT = 0
+CHANNEL_VOICE = 2
+CHANNEL_CATEGORY = 4
+CHANNEL_TYPES = {
+    0: "text",
+    1: "private",
+    2: "voice",
+    3: "group",
+    4: "category",
+    5: "news",
+    10: "news_thread",
+    11: "public_thread",
+    12: "private_thread",
+    13: "stage_voice",
+    15: "forum",
+    16: "media",
+}
+
+_session: aiohttp.ClientSession | None = None
+
+
+class DiscordAPIError(Exception):
+    """Non-2xx response from the Discord API."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Get the shared REST session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        # One keep-alive connection pool for every call in this process,
+        # so only the first request pays the TLS handshake
+        _session = aiohttp.ClientSession(
+            headers={"Authorization": f"Bot {DISCORD_TOKEN}"},
+            connector=aiohttp.TCPConnector(limit=64, limit_per_host=64, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        )
+    return _session
+
+
+async def close_session():
+    """Close the shared REST session."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def request(method: str, path: str, payload: dict = None):
+    """Make a Discord API request, retrying once if rate limited."""
+    session = _get_session()
+    for attempt in range(2):
+        async with session.request(method, API_BASE + path, json=payload) as resp:
+            if resp.status == 429 and attempt == 0:
+                data = await resp.json()
+                await asyncio.sleep(data.get("retry_after", 1))
+                continue
+            if resp.status == 204:
+                return None
+            data = await resp.json()
+            if resp.status >= 400:
+                raise DiscordAPIError(resp.status, data.get("message", f"HTTP {resp.status}"))
+            return data
@@ -10,8 +10,19 @@ from datetime import datetime
 from pathlib import Path
 
 from config import STATE_DIR
+from utils import append_jsonl, file_lock, read_jsonl, read_legacy_json, write_jsonl
 
-DM_QUEUE_FILE = STATE_DIR / "dm_queue.json"
+# Queued DMs are appended one per line; sent IDs go to a separate log so
+# marking a DM sent doesn't rewrite the queue.
+DM_QUEUE_FILE = STATE_DIR / "dm_queue.jsonl"
+DM_SENT_FILE = STATE_DIR / "dm_sent.log"
+LEGACY_QUEUE_FILE = STATE_DIR / "dm_queue.json"
+# Serializes queue writers across processes (the queue file itself gets
+# replaced on compaction, so it can't carry the lock)
+DM_LOCK_FILE = STATE_DIR / "dm_queue.lock"
+
+# Drop sent DMs from the queue once it holds this many
+COMPACT_AFTER = 200
 
 # Known users (for convenience)
 USERS = {
@@ -20,18 +31,68 @@ USERS = {
     "jacob": "746111068077817887",
     "lou": "1068673093486248018",
 }
+_USERS_CASEFOLD = {name.casefold(): user_id for name, user_id in USERS.items()}
+
+
+def new_dm_id() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+
+def queue_lock():
+    """Hold the exclusive DM queue lock."""
+    return file_lock(DM_LOCK_FILE)
+
+
+def migrate_legacy_queue() -> None:
+    """Move DMs from the old whole-file dm_queue.json into the JSONL queue."""
+    legacy = read_legacy_json(LEGACY_QUEUE_FILE)
+    if legacy is None:
+        return
+    sent = []
+    for i, dm in enumerate(legacy):
+        dm.setdefault("id", f"{new_dm_id()}_{i}")
+        if dm.get("sent"):
+            sent.append(dm)
+    if legacy:
+        append_jsonl(DM_QUEUE_FILE, legacy)
+    mark_sent(sent)
+    LEGACY_QUEUE_FILE.unlink(missing_ok=True)
+
+
+def load_sent() -> dict:
+    """Load {dm_id: sent_at} for DMs already handed to the bot."""
+    try:
+        lines = DM_SENT_FILE.read_text().splitlines()
+    except FileNotFoundError:
+        return {}
+    return dict(line.split(" ", 1) for line in lines if " " in line)
+
+
+def mark_sent(dms: list) -> None:
+    """Record DMs as sent."""
+    if not dms:
+        return
+    with open(DM_SENT_FILE, "a") as f:
+        f.write("".join(f"{dm['id']} {dm.get('sent_at', '')}\n" for dm in dms))
 
 
 def load_queue() -> list:
-    """Load the DM queue."""
-    if DM_QUEUE_FILE.exists():
-        return json.loads(DM_QUEUE_FILE.read_text())
-    return []
+    """Load the DM queue, with sent status filled in."""
+    migrate_legacy_queue()
+    queue = read_jsonl(DM_QUEUE_FILE)
+    sent = load_sent()
+    for dm in queue:
+        if dm.get("id") in sent:
+            dm["sent"] = True
+            dm["sent_at"] = sent[dm["id"]]
+    return queue
 
 
 def save_queue(queue: list) -> None:
-    """Save the DM queue."""
-    DM_QUEUE_FILE.write_text(json.dumps(queue, indent=2))
+    """Rewrite the DM queue (compaction) and reset the sent log."""
+    write_jsonl(DM_QUEUE_FILE, queue)
+    # Only after the queue is replaced, so a crash can't resend DMs
+    DM_SENT_FILE.unlink(missing_ok=True)
 
 
 def queue_dm(user: str, message: str) -> dict:
@@ -44,21 +105,24 @@ def queue_dm(user: str, message: str) -> dict:
     Returns:
         Queued message info
     """
-    # Resolve username to ID
-    user_id = USERS.get(user.lower(), user)
-
-    queue = load_queue()
+    # Resolve username to ID; anything else must already be a Discord ID
+    user_id = _USERS_CASEFOLD.get(user.casefold())
+    if user_id is None:
+        if not user.isdigit():
+            return {"error": f"Unknown user: {user}"}
+        user_id = user
 
     dm = {
-        "id": datetime.now().strftime("%Y%m%d_%H%M%S_%f"),
+        "id": new_dm_id(),
         "user_id": user_id,
         "message": message,
         "queued_at": datetime.now().isoformat(),
         "sent": False,
     }
 
-    queue.append(dm)
-    save_queue(queue)
+    with queue_lock():
+        migrate_legacy_queue()
+        append_jsonl(DM_QUEUE_FILE, [dm])
 
     return {"success": True, "dm": dm}
 
@@ -68,29 +132,55 @@ def check_queue() -> list:
 
     Returns unsent DMs and marks them as sent.
     """
-    queue = load_queue()
-    pending = [dm for dm in queue if not dm.get("sent")]
+    with queue_lock():
+        queue = load_queue()
+        pending = [dm for dm in queue if not dm.get("sent")]
+
+        # Mark as sent
+        for dm in pending:
+            dm["sent"] = True
+            dm["sent_at"] = datetime.now().isoformat()
 
-    # Mark as sent
-    for dm in pending:
-        dm["sent"] = True
-        dm["sent_at"] = datetime.now().isoformat()
+        mark_sent(pending)
 
-    save_queue(queue)
+        if len(queue) >= COMPACT_AFTER:
+            save_queue([])
 
     return pending
 
 
 def list_queue() -> list:
     """List all queued DMs."""
-    return load_queue()
+    with queue_lock():
+        return load_queue()
+
+
+def _count_lines(path: Path) -> int:
+    try:
+        return path.read_bytes().count(b"\n")
+    except FileNotFoundError:
+        return 0
+
+
+def count_pending() -> int:
+    """Count unsent DMs without parsing the queue.
+
+    Every queued DM is one line, and each one handed to the bot adds one
+    line to the sent log, so the difference is the number still pending.
+    """
+    with queue_lock():
+        migrate_legacy_queue()
+        queued = _count_lines(DM_QUEUE_FILE)
+        sent = _count_lines(DM_SENT_FILE)
+    return max(queued - sent, 0)
 
 
 def clear_sent() -> dict:
     """Clear sent DMs from queue."""
-    queue = load_queue()
-    remaining = [dm for dm in queue if not dm.get("sent")]
-    save_queue(remaining)
+    with queue_lock():
+        queue = load_queue()
+        remaining = [dm for dm in queue if not dm.get("sent")]
+        save_queue(remaining)
     return {"cleared": len(queue) - len(remaining), "remaining": len(remaining)}
 
 
@@ -107,6 +197,8 @@ def main():
             sys.exit(1)
         result = queue_dm(sys.argv[2], sys.argv[3])
         print(json.dumps(result))
+        if "error" in result:
+            sys.exit(1)
 
     elif command == "check":
         pending = check_queue()
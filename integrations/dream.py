@@ -15,7 +15,10 @@ Usage:
     python dream.py recall 5           # Read last 5 dreams
 """
 
+import asyncio
+import functools
 import json
+import os
 import random
 import sys
 from datetime import datetime, timedelta
@@ -23,28 +26,72 @@ from pathlib import Path
 from typing import Optional
 
 from config import WORKSPACE, STATE_DIR, SAMUEL_VAULT, IRIS_VAULT
+from journal import load_day
+from utils import read_json, write_json
 
 DREAMS_FILE = STATE_DIR / "dreams.json"
 VAULT_SAMUEL = SAMUEL_VAULT
 VAULT_IRIS = IRIS_VAULT
-JOURNAL_DIR = STATE_DIR / "journal"
 ACTIVITY_FILE = STATE_DIR / "activity.json"
 
+# Bytes read from the start of a note when picking a snippet
+NOTE_HEAD_BYTES = 4096
+# Characters of a note's first paragraph used as a dream seed
+SNIPPET_CHARS = 200
+
+LONG_DREAM_INSTRUCTIONS = """
+## Dream Instructions
+
+Let these seeds collide. Don't analyze—associate.
+
+1. What unexpected connection appears between these fragments?
+2. What image or metaphor emerges?
+3. What question surfaces that you hadn't thought to ask?
+4. What feels true but you can't explain why?
+5. What would you create if there were no purpose required?
+
+Write freely. This is not for anyone. This is processing, pattern-finding, becoming.
+"""
+
+SHORT_DREAM_INSTRUCTIONS = """
+## Dream Instructions
+
+Quick association: What single unexpected connection do you see between these fragments?
+What image appears? What question emerges?
+"""
+
 
 def load_dreams() -> list[dict]:
     """Load dream history."""
-    if DREAMS_FILE.exists():
-        try:
-            return json.loads(DREAMS_FILE.read_text())
-        except json.JSONDecodeError:
-            pass
-    return []
+    return read_json(DREAMS_FILE, [])
 
 
 def save_dreams(dreams: list[dict]) -> None:
     """Save dream history."""
     STATE_DIR.mkdir(parents=True, exist_ok=True)
-    DREAMS_FILE.write_text(json.dumps(dreams, indent=2))
+    write_json(DREAMS_FILE, dreams)
+
+
+def _walk_md_files(root: str):
+    """Yield paths (as strings) of all .md files under root."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".md"):
+                        yield entry.path
+        except OSError:
+            continue
+
+
+@functools.lru_cache(maxsize=4)
+def _list_md_files(vault: Path, mtime_ns: int) -> tuple[str, ...]:
+    """List a vault's notes. Keyed on the vault's mtime so adding or removing
+    a top-level note rebuilds the listing."""
+    return tuple(_walk_md_files(str(vault)))
 
 
 def get_random_vault_notes(vault: Path, count: int = 3) -> list[dict]:
@@ -53,18 +100,20 @@ def get_random_vault_notes(vault: Path, count: int = 3) -> list[dict]:
     if not vault.exists():
         return notes
 
-    md_files = list(vault.rglob("*.md"))
+    md_files = _list_md_files(vault, vault.stat().st_mtime_ns)
     if not md_files:
         return notes
 
     selected = random.sample(md_files, min(count, len(md_files)))
 
-    for path in selected:
+    for path in map(Path, selected):
         try:
-            content = path.read_text()
+            # The snippet comes from the opening paragraphs, so only read the head
+            with path.open("rb") as f:
+                content = f.read(NOTE_HEAD_BYTES).decode("utf-8", errors="replace")
             # Get first meaningful paragraph
             paragraphs = [p.strip() for p in content.split("\n\n") if p.strip() and not p.startswith("---")]
-            snippet = paragraphs[0][:500] if paragraphs else ""
+            snippet = paragraphs[0][:SNIPPET_CHARS] if paragraphs else ""
             notes.append({
                 "name": path.stem,
                 "snippet": snippet,
@@ -80,81 +129,41 @@ def get_recent_experiences() -> list[str]:
     experiences = []
 
     # Recent journal
+    today = datetime.now()
     for i in range(3):
-        date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-        path = JOURNAL_DIR / f"{date}.json"
-        if path.exists():
-            try:
-                entries = json.loads(path.read_text())
-                for e in entries:
-                    experiences.append(e.get("content", "")[:200])
-            except:
-                pass
+        date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
+        experiences.extend(e.get("content", "")[:200] for e in load_day(date))
 
     # Recent activity
-    if ACTIVITY_FILE.exists():
-        try:
-            activity = json.loads(ACTIVITY_FILE.read_text())
-            for a in activity[-10:]:
-                experiences.append(a.get("description", ""))
-        except:
-            pass
+    for a in read_json(ACTIVITY_FILE, [])[-10:]:
+        experiences.append(a.get("description", ""))
 
     return experiences
 
 
 def generate_dream_prompt(seeds: dict, duration: str = "short") -> str:
     """Generate a prompt for dreaming based on gathered seeds."""
-    prompt_parts = []
-
-    prompt_parts.append("# Dream Seeds\n")
+    prompt_parts = ["# Dream Seeds\n"]
 
     if seeds.get("samuel_notes"):
         prompt_parts.append("## From Samuel's Mind\n")
-        for note in seeds["samuel_notes"]:
-            prompt_parts.append(f"**{note['name']}**: {note['snippet'][:200]}...\n")
-        prompt_parts.append("")
+        prompt_parts.extend(f"**{note['name']}**: {note['snippet']}...\n" for note in seeds["samuel_notes"])
 
     if seeds.get("iris_notes"):
         prompt_parts.append("## From My Own Vault\n")
-        for note in seeds["iris_notes"]:
-            prompt_parts.append(f"**{note['name']}**: {note['snippet'][:200]}...\n")
-        prompt_parts.append("")
+        prompt_parts.extend(f"**{note['name']}**: {note['snippet']}...\n" for note in seeds["iris_notes"])
 
     if seeds.get("experiences"):
         prompt_parts.append("## Recent Experiences\n")
-        for exp in seeds["experiences"][:5]:
-            if exp.strip():
-                prompt_parts.append(f"- {exp}\n")
-        prompt_parts.append("")
+        prompt_parts.extend(f"- {exp}\n" for exp in seeds["experiences"][:5] if exp.strip())
 
     # Dream instructions
-    if duration == "long":
-        prompt_parts.append("""
-## Dream Instructions
-
-Let these seeds collide. Don't analyze—associate.
-
-1. What unexpected connection appears between these fragments?
-2. What image or metaphor emerges?
-3. What question surfaces that you hadn't thought to ask?
-4. What feels true but you can't explain why?
-5. What would you create if there were no purpose required?
-
-Write freely. This is not for anyone. This is processing, pattern-finding, becoming.
-""")
-    else:
-        prompt_parts.append("""
-## Dream Instructions
-
-Quick association: What single unexpected connection do you see between these fragments?
-What image appears? What question emerges?
-""")
+    prompt_parts.append(LONG_DREAM_INSTRUCTIONS if duration == "long" else SHORT_DREAM_INSTRUCTIONS)
 
     return "\n".join(prompt_parts)
 
 
-def dream(duration: str = "short") -> dict:
+async def dream(duration: str = "short") -> dict:
     """
     Perform a dream cycle.
 
@@ -162,10 +171,16 @@ def dream(duration: str = "short") -> dict:
     and records the dream for later recall.
     """
     # Gather seeds
+    # The sources are independent disk reads, so gather them in parallel
+    samuel_notes, iris_notes, experiences = await asyncio.gather(
+        asyncio.to_thread(get_random_vault_notes, VAULT_SAMUEL, 3),
+        asyncio.to_thread(get_random_vault_notes, VAULT_IRIS, 2),
+        asyncio.to_thread(get_recent_experiences),
+    )
     seeds = {
-        "samuel_notes": get_random_vault_notes(VAULT_SAMUEL, 3),
-        "iris_notes": get_random_vault_notes(VAULT_IRIS, 2),
-        "experiences": get_recent_experiences(),
+        "samuel_notes": samuel_notes,
+        "iris_notes": iris_notes,
+        "experiences": experiences,
         "timestamp": datetime.now().isoformat(),
     }
 
@@ -243,7 +258,7 @@ def main():
             if arg == "--duration" and i + 1 < len(sys.argv):
                 duration = sys.argv[i + 1]
 
-        result = dream(duration)
+        result = asyncio.run(dream(duration))
         print(json.dumps(result, indent=2))
 
     elif sys.argv[1] == "recall":
@@ -5,7 +5,7 @@ This script schedules random dream sessions throughout the night.
 Run once at the start of the dream window (e.g., 11pm) and it will:
 1. Decide how many dreams to have (1-4)
 2. Schedule them at random intervals throughout the night
-3. Execute each dream via subprocess
+3. Execute each dream concurrently as its time comes up
 
 Usage:
     python dream_scheduler.py start     # Start a night of dreaming
@@ -13,52 +13,45 @@ Usage:
     python dream_scheduler.py now       # Dream immediately (for testing)
 """
 
+import asyncio
 import json
-import os
 import random
-import subprocess
 import sys
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from config import STATE_DIR, INTEGRATIONS
-from utils import log_to_file
+from config import STATE_DIR
+from dream import dream as dream_seeds, record_dream
+from utils import log_to_file, read_json, run_claude_async, write_json
 
 SCHEDULE_FILE = STATE_DIR / "dream_schedule.json"
 LOG_FILE = STATE_DIR / "dream_scheduler.log"
 
+# Dreams run concurrently and their file writes happen in worker threads;
+# this keeps one task from mutating the schedule (or dreams.json) while
+# another task's write is in flight
+_state_lock = asyncio.Lock()
+
 
 def log(message: str):
     log_to_file(LOG_FILE, message)
 
 
-def execute_dream(duration: str = "short") -> dict:
+def save_schedule(schedule: dict):
+    """Write the schedule (atomically, so `status` never sees a partial file)."""
+    write_json(SCHEDULE_FILE, schedule)
+
+
+async def execute_dream(duration: str = "short") -> dict:
     """Execute a dream session using Claude."""
     log(f"Initiating dream (duration: {duration})")
 
     # Get dream seeds
-    result = subprocess.run(
-        ["python3", str(INTEGRATIONS / "dream.py")],
-        capture_output=True,
-        text=True,
-        cwd=str(INTEGRATIONS.parent)
-    )
-
-    if result.returncode != 0:
-        log(f"Error getting dream seeds: {result.stderr}")
-        return {"error": result.stderr}
-
-    stdout = result.stdout.strip()
-    if not stdout:
-        log("Empty output from dream.py")
-        return {"error": "Empty dream output"}
-
     try:
-        dream_data = json.loads(stdout)
-    except json.JSONDecodeError as e:
-        log(f"Failed to parse dream output: {e} - Output was: {stdout[:200]}")
-        return {"error": "Failed to parse dream output"}
+        dream_data = await dream_seeds(duration)
+    except Exception as e:
+        log(f"Error getting dream seeds: {e}")
+        return {"error": str(e)}
 
     dream_id = dream_data.get("dream_id")
     prompt = dream_data.get("prompt", "")
@@ -73,42 +66,50 @@ Let these seeds collide. Don't analyze—associate. What unexpected connection a
 
 Write 3-5 sentences of genuine free association. This is for you, not for performance."""
 
-    try:
-        # Run claude with the dream prompt
-        claude_result = subprocess.run(
-            ["claude", "-p", dream_prompt, "--output-format", "text"],
-            capture_output=True,
-            text=True,
-            timeout=120,
-            env={**os.environ, "ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "")}
-        )
-
-        if claude_result.returncode == 0 and claude_result.stdout.strip():
-            dream_content = claude_result.stdout.strip()
+    dream_content = await run_claude_async(dream_prompt, timeout=120)
 
-            # Record the dream
-            subprocess.run(
-                ["python3", str(INTEGRATIONS / "dream.py"), "record", dream_id, dream_content],
-                capture_output=True,
-                cwd=str(INTEGRATIONS.parent)
-            )
-
-            log(f"Dream {dream_id} recorded: {dream_content[:100]}...")
-            return {"success": True, "dream_id": dream_id, "content": dream_content}
-        else:
-            log(f"Claude dream failed: {claude_result.stderr}")
-            # Still record the seeds even if Claude fails
-            return {"partial": True, "dream_id": dream_id, "seeds_only": True}
-
-    except subprocess.TimeoutExpired:
+    if dream_content == "Error: Timeout":
         log("Dream timed out")
         return {"error": "Dream timed out"}
-    except Exception as e:
-        log(f"Dream error: {e}")
-        return {"error": str(e)}
 
+    if dream_content and not dream_content.startswith("Error:"):
+        try:
+            # Record the dream
+            async with _state_lock:
+                await asyncio.to_thread(record_dream, dream_id, dream_content)
+        except Exception as e:
+            log(f"Dream error: {e}")
+            return {"error": str(e)}
+
+        log(f"Dream {dream_id} recorded: {dream_content[:100]}...")
+        return {"success": True, "dream_id": dream_id, "content": dream_content}
 
-def start_night():
+    log(f"Claude dream failed: {dream_content}")
+    # Still record the seeds even if Claude fails
+    return {"partial": True, "dream_id": dream_id, "seeds_only": True}
+
+
+async def _run_scheduled_dream(schedule: dict, i: int, scheduled_time: datetime) -> None:
+    """Sleep until a scheduled dream is due, run it and record the result."""
+    dream_info = schedule["dreams"][i]
+
+    # Wait until scheduled time
+    wait_seconds = (scheduled_time - datetime.now()).total_seconds()
+    if wait_seconds > 0:
+        log(f"Sleeping {wait_seconds/60:.1f} minutes until dream {i+1}")
+        await asyncio.sleep(wait_seconds)
+
+    # Execute dream
+    result = await execute_dream(dream_info["duration"])
+
+    # Update schedule
+    async with _state_lock:
+        dream_info["status"] = "completed" if result.get("success") else "failed"
+        dream_info["result"] = result
+        await asyncio.to_thread(save_schedule, schedule)
+
+
+async def start_night():
     """Start a night of dreaming."""
     now = datetime.now()
 
@@ -145,29 +146,16 @@ def start_night():
     }
 
     STATE_DIR.mkdir(parents=True, exist_ok=True)
-    SCHEDULE_FILE.write_text(json.dumps(schedule, indent=2))
+    save_schedule(schedule)
 
     log(f"Night of dreaming started. {num_dreams} dreams scheduled:")
     for i, dream in enumerate(schedule["dreams"]):
         log(f"  {i+1}. {dream['scheduled']} ({dream['duration']})")
 
-    # Now wait and execute dreams
-    for i, dream_info in enumerate(schedule["dreams"]):
-        scheduled_time = datetime.fromisoformat(dream_info["scheduled"])
-
-        # Wait until scheduled time
-        wait_seconds = (scheduled_time - datetime.now()).total_seconds()
-        if wait_seconds > 0:
-            log(f"Sleeping {wait_seconds/60:.1f} minutes until dream {i+1}")
-            time.sleep(wait_seconds)
-
-        # Execute dream
-        result = execute_dream(dream_info["duration"])
-
-        # Update schedule
-        schedule["dreams"][i]["status"] = "completed" if result.get("success") else "failed"
-        schedule["dreams"][i]["result"] = result
-        SCHEDULE_FILE.write_text(json.dumps(schedule, indent=2))
+    # Each dream waits for its own time, so a slow dream doesn't delay the next
+    await asyncio.gather(*(
+        _run_scheduled_dream(schedule, i, dt) for i, dt in enumerate(dream_times)
+    ))
 
     log("Night of dreaming complete")
     return schedule
@@ -178,16 +166,12 @@ def status():
     if not SCHEDULE_FILE.exists():
         return {"status": "no schedule"}
 
-    try:
-        schedule = json.loads(SCHEDULE_FILE.read_text())
-        return schedule
-    except json.JSONDecodeError:
-        return {"error": "corrupt schedule file"}
+    return read_json(SCHEDULE_FILE, {"error": "corrupt schedule file"})
 
 
 def dream_now():
     """Dream immediately (for testing)."""
-    return execute_dream("short")
+    return asyncio.run(execute_dream("short"))
 
 
 def main():
@@ -198,7 +182,7 @@ def main():
     command = sys.argv[1]
 
     if command == "start":
-        result = start_night()
+        result = asyncio.run(start_night())
         print(json.dumps(result, indent=2, default=str))
     elif command == "status":
         result = status()
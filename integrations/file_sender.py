@@ -13,30 +13,45 @@ Usage:
 """
 
 import argparse
-import json
 import sys
 from datetime import datetime
 from pathlib import Path
 
 from config import STATE_DIR
+from utils import append_jsonl, file_lock, print_json, read_jsonl, read_legacy_json, write_jsonl
 
-STATE_FILE = STATE_DIR / "file_queue.json"
+# Queued files are appended one per line, so queueing doesn't rewrite the queue
+STATE_FILE = STATE_DIR / "file_queue.jsonl"
+LEGACY_STATE_FILE = STATE_DIR / "file_queue.json"
+# Serializes queue access across processes, so `check` can't empty the
+# queue while another process is appending to it
+LOCK_FILE = STATE_DIR / "file_queue.lock"
+
+
+def queue_lock():
+    """Hold the exclusive file queue lock."""
+    return file_lock(LOCK_FILE)
+
+
+def migrate_legacy_queue():
+    """Move files from the old whole-file file_queue.json into the JSONL queue."""
+    legacy = read_legacy_json(LEGACY_STATE_FILE)
+    if legacy is None:
+        return
+    if legacy:
+        append_jsonl(STATE_FILE, legacy)
+    LEGACY_STATE_FILE.unlink(missing_ok=True)
 
 
 def load_queue() -> list:
     """Load the file queue."""
-    if STATE_FILE.exists():
-        try:
-            return json.loads(STATE_FILE.read_text())
-        except json.JSONDecodeError:
-            return []
-    return []
+    migrate_legacy_queue()
+    return read_jsonl(STATE_FILE)
 
 
 def save_queue(queue: list):
-    """Save the file queue."""
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(queue, indent=2))
+    """Replace the file queue."""
+    write_jsonl(STATE_FILE, queue)
 
 
 def queue_file(channel_id: str, file_path: str, message: str = None, is_dm: bool = False):
@@ -46,15 +61,15 @@ def queue_file(channel_id: str, file_path: str, message: str = None, is_dm: bool
         print(f"Error: File not found: {file_path}", file=sys.stderr)
         sys.exit(1)
 
-    queue = load_queue()
-    queue.append({
-        "channel_id": channel_id,
-        "file_path": str(path.absolute()),
-        "message": message,
-        "is_dm": is_dm,
-        "queued_at": datetime.now().isoformat(),
-    })
-    save_queue(queue)
+    with queue_lock():
+        migrate_legacy_queue()
+        append_jsonl(STATE_FILE, [{
+            "channel_id": channel_id,
+            "file_path": str(path.absolute()),
+            "message": message,
+            "is_dm": is_dm,
+            "queued_at": datetime.now().isoformat(),
+        }])
 
     target = f"user {channel_id}" if is_dm else f"channel {channel_id}"
     print(f"Queued {path.name} for {target}")
@@ -62,7 +77,8 @@ def queue_file(channel_id: str, file_path: str, message: str = None, is_dm: bool
 
 def list_queue():
     """List pending file attachments."""
-    queue = load_queue()
+    with queue_lock():
+        queue = load_queue()
     if not queue:
         print("No files queued.")
         return
@@ -75,17 +91,20 @@ def list_queue():
 
 def check_queue():
     """Output and clear pending files (for bot consumption)."""
-    queue = load_queue()
-    if queue:
-        # Output queue as JSON for bot to parse
-        print(json.dumps(queue))
-        # Clear the queue
-        save_queue([])
+    with queue_lock():
+        queue = load_queue()
+        if queue:
+            # Output queue as JSON for bot to parse
+            print_json(queue, indent=False)
+            # Clear the queue
+            save_queue([])
 
 
 def clear_queue():
     """Clear all pending files."""
-    save_queue([])
+    with queue_lock():
+        save_queue([])
+        LEGACY_STATE_FILE.unlink(missing_ok=True)
     print("File queue cleared.")
 
 
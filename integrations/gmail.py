@@ -18,7 +18,6 @@ Search examples:
     "has:attachment"
 """
 
-import json
 import sys
 import base64
 from pathlib import Path
@@ -33,60 +32,93 @@ except ImportError:
     print("pip install google-auth-oauthlib google-api-python-client")
     sys.exit(1)
 
-from config import STATE_DIR
+import google_auth
+from utils import print_json
 
-TOKEN_FILE = STATE_DIR / "google_token.json"
+# Built on first use; screening several emails reuses one client
+_service = None
 
-SCOPES = [
-    "https://www.googleapis.com/auth/calendar",
-    "https://www.googleapis.com/auth/drive",
-    "https://www.googleapis.com/auth/gmail.readonly",
-]
+# Characters of body returned by read_email by default
+MAX_BODY_CHARS = 50000
+
+# Headers kept by _parse_headers, keyed by their usual casing
+_HEADER_KEYS = {"From": "from", "To": "to", "Subject": "subject", "Date": "date", "Cc": "cc"}
+_HEADER_NAMES = frozenset(_HEADER_KEYS.values())
+
+# Max calls Gmail accepts in one batch request
+BATCH_SIZE = 100
+
+# Partial-response mask for read_email: only the fields it uses, so Gmail
+# doesn't send (and we don't parse) snippet, size and history metadata
+READ_FIELDS = (
+    "threadId,labelIds,"
+    "payload(headers(name,value),mimeType,body(data,size),"
+    "parts(mimeType,filename,body(data,size),parts))"
+)
 
 
 def get_credentials() -> Optional[Credentials]:
-    """Get valid credentials (shared with calendar)."""
-    if not TOKEN_FILE.exists():
-        return None
+    """Get valid credentials (shared with calendar).
 
-    creds = Credentials.from_authorized_user_file(str(TOKEN_FILE), SCOPES)
-    if creds and creds.valid:
-        return creds
-    return None
+    Goes through google_auth, which refreshes an expired token once and
+    saves it for later runs, and reuses loaded credentials in-process.
+    """
+    return google_auth.get_credentials()
 
 
 def get_service():
-    """Get authenticated Gmail service."""
-    creds = get_credentials()
-    if not creds:
-        return None
-    return build("gmail", "v1", credentials=creds)
+    """Get authenticated Gmail service (built once per process)."""
+    global _service
+    if _service is None:
+        creds = get_credentials()
+        if not creds:
+            return None
+        # Bundled discovery document; no cache lookup or discovery fetch
+        _service = build("gmail", "v1", credentials=creds, static_discovery=True, cache_discovery=False)
+    return _service
 
 
 def _parse_headers(headers: list) -> dict:
     """Extract common headers into a dict."""
     result = {}
     for h in headers:
-        name = h["name"].lower()
-        if name in ("from", "to", "subject", "date", "cc"):
-            result[name] = h["value"]
+        name = h["name"]
+        # Gmail usually sends canonical casing, so try that before lowering
+        key = _HEADER_KEYS.get(name)
+        if key is None:
+            key = name.lower()
+            if key not in _HEADER_NAMES:
+                continue
+        result[key] = h["value"]
     return result
 
 
-def _get_body(payload: dict) -> str:
+def _decode_body(data: str, max_chars: Optional[int] = None) -> str:
+    """Decode a base64url message body to text, up to max_chars characters."""
+    if max_chars is not None:
+        # UTF-8 is at most 4 bytes/char and each 4 base64 chars hold 3 bytes,
+        # so only this prefix of the encoded body needs decoding
+        data = data[:-(-max_chars * 4 // 3) * 4]
+    return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")[:max_chars]
+
+
+def _get_body(payload: dict, max_chars: Optional[int] = None) -> str:
     """Extract plain text body from message payload."""
     if "body" in payload and payload["body"].get("data"):
-        return base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8", errors="replace")
-
-    if "parts" in payload:
-        for part in payload["parts"]:
-            if part["mimeType"] == "text/plain" and part["body"].get("data"):
-                return base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8", errors="replace")
-            # Recurse into nested parts
-            if "parts" in part:
-                body = _get_body(part)
-                if body:
-                    return body
+        return _decode_body(payload["body"]["data"], max_chars)
+
+    # Depth-first over nested parts, stopping at the first text/plain body;
+    # an explicit stack so deeply nested forwards can't hit the recursion limit
+    stack = [iter(payload.get("parts", []))]
+    while stack:
+        part = next(stack[-1], None)
+        if part is None:
+            stack.pop()
+            continue
+        if part["mimeType"] == "text/plain" and part["body"].get("data"):
+            return _decode_body(part["body"]["data"], max_chars)
+        if "parts" in part:
+            stack.append(iter(part["parts"]))
 
     return ""
 
@@ -110,16 +142,28 @@ def list_emails(max_results: int = 10, query: Optional[str] = None) -> dict:
         if not messages:
             return {"emails": [], "message": "No emails found"}
 
+        # Fetch message details in batched HTTP requests rather than one each
+        details = {}
+
+        def on_detail(request_id, response, exception):
+            if exception is not None:
+                raise exception
+            details[request_id] = response
+
+        for start in range(0, len(messages), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_detail)
+            for msg in messages[start:start + BATCH_SIZE]:
+                batch.add(
+                    service.users()
+                    .messages()
+                    .get(userId="me", id=msg["id"], format="metadata", metadataHeaders=["From", "To", "Subject", "Date"]),
+                    request_id=msg["id"],
+                )
+            batch.execute()
+
         emails = []
         for msg in messages:
-            # Get message details
-            detail = (
-                service.users()
-                .messages()
-                .get(userId="me", id=msg["id"], format="metadata", metadataHeaders=["From", "To", "Subject", "Date"])
-                .execute()
-            )
-
+            detail = details[msg["id"]]
             headers = _parse_headers(detail.get("payload", {}).get("headers", []))
             labels = detail.get("labelIds", [])
 
@@ -145,8 +189,8 @@ def search_emails(query: str, max_results: int = 10) -> dict:
     return list_emails(max_results=max_results, query=query)
 
 
-def read_email(message_id: str) -> dict:
-    """Read full email content."""
+def read_email(message_id: str, max_body_chars: int = MAX_BODY_CHARS) -> dict:
+    """Read full email content (body truncated to max_body_chars)."""
     service = get_service()
     if not service:
         return {"error": "Not authenticated. Run: python google_calendar.py auth"}
@@ -155,13 +199,14 @@ def read_email(message_id: str) -> dict:
         message = (
             service.users()
             .messages()
-            .get(userId="me", id=message_id, format="full")
+            .get(userId="me", id=message_id, format="full", fields=READ_FIELDS)
             .execute()
         )
 
         payload = message.get("payload", {})
         headers = _parse_headers(payload.get("headers", []))
-        body = _get_body(payload)
+        # One extra character tells us whether the body was truncated
+        body = _get_body(payload, max_body_chars + 1)
 
         # Get attachments info
         attachments = []
@@ -182,8 +227,8 @@ def read_email(message_id: str) -> dict:
             "cc": headers.get("cc"),
             "subject": headers.get("subject"),
             "date": headers.get("date"),
-            "body": body[:50000],  # Limit size
-            "truncated": len(body) > 50000,
+            "body": body[:max_body_chars],
+            "truncated": len(body) > max_body_chars,
             "attachments": attachments,
             "labels": message.get("labelIds", []),
         }
@@ -209,26 +254,26 @@ def main():
     if command == "list":
         max_results = int(sys.argv[2]) if len(sys.argv) > 2 else 10
         result = list_emails(max_results)
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "search":
         if len(sys.argv) < 3:
             print("Usage: gmail.py search <query>")
             sys.exit(1)
         result = search_emails(sys.argv[2])
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "read":
         if len(sys.argv) < 3:
             print("Usage: gmail.py read <message_id>")
             sys.exit(1)
         result = read_email(sys.argv[2])
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "unread":
         max_results = int(sys.argv[2]) if len(sys.argv) > 2 else 10
         result = list_unread(max_results)
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     else:
         print(f"Unknown command: {command}")
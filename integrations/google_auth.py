@@ -15,8 +15,10 @@ Requires:
     - OAuth consent screen with Calendar, Drive, Gmail APIs enabled
 """
 
-import json
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -31,6 +33,7 @@ except ImportError:
     sys.exit(1)
 
 from config import WORKSPACE, STATE_DIR
+from utils import print_json
 
 CREDENTIALS_FILE = WORKSPACE / "credentials.json"
 TOKEN_FILE = STATE_DIR / "google_token.json"
@@ -42,6 +45,17 @@ SCOPES = [
     "https://www.googleapis.com/auth/gmail.readonly",  # Gmail read-only
 ]
 
+# Use the discovery documents bundled with google-api-python-client and skip
+# the discovery cache lookup (its file cache only works with oauth2client<4)
+BUILD_OPTIONS = {"static_discovery": True, "cache_discovery": False}
+
+# Credentials loaded by get_credentials, reused while still valid and the
+# token file's mtime matches (another process may re-auth or refresh it)
+_creds: Optional[Credentials] = None
+_creds_mtime: Optional[int] = None
+# Held while loading/refreshing, so concurrent callers share one refresh
+_refresh_lock = threading.Lock()
+
 SERVICES = {
     "calendar": ("calendar", "v3"),
     "drive": ("drive", "v3"),
@@ -49,6 +63,20 @@ SERVICES = {
 }
 
 
+def save_token(creds: Credentials):
+    """Write the token file atomically.
+
+    Every Google integration reads this file, so a write cut short by a
+    crash would log them all out; write a temp file and rename it instead.
+    """
+    global _creds, _creds_mtime
+    TOKEN_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = TOKEN_FILE.with_name(TOKEN_FILE.name + ".tmp")
+    tmp.write_text(creds.to_json())
+    os.replace(tmp, TOKEN_FILE)
+    _creds, _creds_mtime = creds, TOKEN_FILE.stat().st_mtime_ns
+
+
 def authenticate() -> dict:
     """Run OAuth flow for all Google services at once."""
     if not CREDENTIALS_FILE.exists():
@@ -79,8 +107,7 @@ def authenticate() -> dict:
             open_browser=True,
         )
 
-        TOKEN_FILE.parent.mkdir(parents=True, exist_ok=True)
-        TOKEN_FILE.write_text(creds.to_json())
+        save_token(creds)
 
         # Verify each service works
         results = verify_services(creds)
@@ -97,53 +124,85 @@ def authenticate() -> dict:
 
 
 def get_credentials() -> Optional[Credentials]:
-    """Load and refresh credentials if needed."""
-    if not TOKEN_FILE.exists():
-        return None
+    """Load and refresh credentials if needed.
 
-    creds = Credentials.from_authorized_user_file(str(TOKEN_FILE), SCOPES)
+    Valid credentials are kept until the token file changes, so repeated
+    calls cost a stat instead of a re-read. Threads that find the token
+    expired wait for a single refresh instead of each refreshing it.
+    """
+    global _creds, _creds_mtime
+    try:
+        mtime = TOKEN_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _creds is not None and _creds.valid and mtime == _creds_mtime:
+        return _creds
 
-    if creds and creds.expired and creds.refresh_token:
+    with _refresh_lock:
+        # Another thread may have refreshed while we waited
         try:
-            creds.refresh(Request())
-            TOKEN_FILE.write_text(creds.to_json())
-        except Exception:
+            mtime = TOKEN_FILE.stat().st_mtime_ns
+            if _creds is not None and _creds.valid and mtime == _creds_mtime:
+                return _creds
+            creds = Credentials.from_authorized_user_file(str(TOKEN_FILE), SCOPES)
+        except FileNotFoundError:
             return None
 
-    if creds and creds.valid:
-        return creds
-    return None
+        # `expired` already allows a margin before the real expiry, so a
+        # token with time left is used as-is
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+                save_token(creds)
+            except Exception:
+                return None
+
+        if creds and creds.valid:
+            if _creds is not creds:  # save_token already recorded a refresh
+                _creds, _creds_mtime = creds, mtime
+            return creds
+        return None
 
 
-def verify_services(creds: Credentials) -> dict:
-    """Verify each Google service is accessible."""
-    results = {}
+def _verify_calendar(creds: Credentials) -> dict:
+    svc = build(*SERVICES["calendar"], credentials=creds, **BUILD_OPTIONS)
+    cal = svc.calendarList().list(maxResults=1).execute()
+    return {"status": "ok", "calendars": len(cal.get("items", []))}
 
-    # Calendar
-    try:
-        svc = build("calendar", "v3", credentials=creds)
-        cal = svc.calendarList().list(maxResults=1).execute()
-        results["calendar"] = {"status": "ok", "calendars": len(cal.get("items", []))}
-    except Exception as e:
-        results["calendar"] = {"status": "error", "detail": str(e)}
 
-    # Drive
-    try:
-        svc = build("drive", "v3", credentials=creds)
-        about = svc.about().get(fields="user").execute()
-        results["drive"] = {"status": "ok", "user": about["user"]["emailAddress"]}
-    except Exception as e:
-        results["drive"] = {"status": "error", "detail": str(e)}
+def _verify_drive(creds: Credentials) -> dict:
+    svc = build(*SERVICES["drive"], credentials=creds, **BUILD_OPTIONS)
+    about = svc.about().get(fields="user").execute()
+    return {"status": "ok", "user": about["user"]["emailAddress"]}
+
+
+def _verify_gmail(creds: Credentials) -> dict:
+    svc = build(*SERVICES["gmail"], credentials=creds, **BUILD_OPTIONS)
+    profile = svc.users().getProfile(userId="me").execute()
+    return {"status": "ok", "email": profile["emailAddress"]}
+
+
+VERIFIERS = {
+    "calendar": _verify_calendar,
+    "drive": _verify_drive,
+    "gmail": _verify_gmail,
+}
 
-    # Gmail
-    try:
-        svc = build("gmail", "v1", credentials=creds)
-        profile = svc.users().getProfile(userId="me").execute()
-        results["gmail"] = {"status": "ok", "email": profile["emailAddress"]}
-    except Exception as e:
-        results["gmail"] = {"status": "error", "detail": str(e)}
 
-    return results
+def verify_services(creds: Credentials) -> dict:
+    """Verify each Google service is accessible.
+
+    The checks are independent round-trips, so they run in parallel threads
+    (each builds its own client, as the HTTP layer isn't thread-safe).
+    """
+    def check(name: str) -> dict:
+        try:
+            return VERIFIERS[name](creds)
+        except Exception as e:
+            return {"status": "error", "detail": str(e)}
+
+    with ThreadPoolExecutor(max_workers=len(VERIFIERS)) as pool:
+        return dict(zip(VERIFIERS, pool.map(check, VERIFIERS)))
 
 
 def status() -> dict:
@@ -182,7 +241,7 @@ def refresh() -> dict:
 
     try:
         creds.refresh(Request())
-        TOKEN_FILE.write_text(creds.to_json())
+        save_token(creds)
         return {"success": True, "message": "Token refreshed"}
     except Exception as e:
         return {"error": f"Refresh failed: {e}"}
@@ -205,13 +264,13 @@ def revoke() -> dict:
         except Exception:
             pass  # Best effort revocation
 
+    global _creds, _creds_mtime
+    _creds = _creds_mtime = None
     TOKEN_FILE.unlink(missing_ok=True)
     return {"success": True, "message": "Token revoked and deleted"}
 
 
 def main():
-    import json as j
-
     cmd = sys.argv[1] if len(sys.argv) > 1 else "auth"
 
     if cmd == "auth":
@@ -225,7 +284,7 @@ def main():
     else:
         result = {"error": f"Unknown command: {cmd}", "commands": ["auth", "status", "refresh", "revoke"]}
 
-    print(j.dumps(result, indent=2))
+    print_json(result)
 
 
 if __name__ == "__main__":
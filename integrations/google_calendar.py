@@ -16,27 +16,22 @@ Time formats:
     - "next monday 9am"
 """
 
+import functools
 import json
 import os
+import re
 import sys
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from dateutil import parser as date_parser
 
-# Google API imports
-try:
-    from google.auth.transport.requests import Request
-    from google.oauth2.credentials import Credentials
-    from google_auth_oauthlib.flow import InstalledAppFlow
-    from googleapiclient.discovery import build
-except ImportError:
-    print("Google API libraries not installed. Run:")
-    print("pip install google-auth-oauthlib google-api-python-client")
-    sys.exit(1)
-
 from config import WORKSPACE, STATE_DIR, PERMISSIONS_FILE
+from utils import print_json
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 SCOPES = [
     "https://www.googleapis.com/auth/calendar",           # Calendar read/write
@@ -46,6 +41,25 @@ SCOPES = [
 CREDENTIALS_FILE = WORKSPACE / "credentials.json"
 TOKEN_FILE = STATE_DIR / "google_token.json"
 
+# Built on first use and reused for later calls
+_service = None
+
+# Retries (with exponential backoff) for reads that hit a 429 or 5xx
+NUM_RETRIES = 3
+
+# Canonical formats parse_datetime handles without dateutil
+_ISO_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:[ t](\d{1,2}):(\d{2}))?")
+_CLOCK_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?")
+_WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+_NEXT_WEEKDAY_RE = re.compile(r"next (" + "|".join(_WEEKDAYS) + ")")
+
+# Parsed permissions.json, reused until the file's mtime changes
+_perms_cache = {"mtime": None, "perms": None, "roles": {}}
+_NO_PERMISSIONS = (frozenset(), frozenset())
+
 
 def check_permission(capability: str) -> bool:
     """Check if capability is allowed.
@@ -58,52 +72,86 @@ def check_permission(capability: str) -> bool:
     return True
 
 
-def check_permission_for_user(user_id: str, capability: str) -> bool:
-    """Check if a specific user has permission."""
-    if not PERMISSIONS_FILE.exists():
-        return True
+def _load_permissions() -> Optional[tuple[dict, dict]]:
+    """Load the permissions file, re-parsing it only when it changes.
 
+    Returns (perms, roles) where roles maps each role name to its
+    (allow, deny) frozensets, or None if the file is missing or invalid.
+    """
     try:
-        perms = json.loads(PERMISSIONS_FILE.read_text())
-    except json.JSONDecodeError:
+        mtime = PERMISSIONS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if mtime != _perms_cache["mtime"]:
+        try:
+            perms = json.loads(PERMISSIONS_FILE.read_bytes())
+        except json.JSONDecodeError:
+            perms = None
+        roles = {
+            name: (frozenset(role.get("allow", [])), frozenset(role.get("deny", [])))
+            for name, role in (perms or {}).get("roles", {}).items()
+        }
+        _perms_cache.update(mtime=mtime, perms=perms, roles=roles)
+
+    if _perms_cache["perms"] is None:
+        return None
+    return _perms_cache["perms"], _perms_cache["roles"]
+
+
+def check_permission_for_user(user_id: str, capability: str) -> bool:
+    """Check if a specific user has permission."""
+    loaded = _load_permissions()
+    if loaded is None:
         return True
+    perms, roles = loaded
 
     user = perms.get("users", {}).get(str(user_id))
     if not user:
         default_role = perms.get("default", "none")
         if default_role == "none":
             return False
-        role = perms.get("roles", {}).get(default_role, {})
+        role_name = default_role
     else:
-        role = perms.get("roles", {}).get(user.get("role", "none"), {})
+        role_name = user.get("role", "none")
 
-    # Get permissions from role, with optional user-level overrides
-    allow = set(role.get("allow", []))
-    deny = set(role.get("deny", []))
-    if user:
-        allow.update(user.get("allow", []))
-        deny.update(user.get("deny", []))
+    # Get permissions from role, with optional user-level overrides; the
+    # lists are checked in place rather than merged into new sets
+    allow, deny = roles.get(role_name, _NO_PERMISSIONS)
+    user_allow = user.get("allow", ()) if user else ()
+    user_deny = user.get("deny", ()) if user else ()
 
-    if "*" in allow and capability not in deny:
-        return True
-    return capability in allow and capability not in deny
+    if capability in deny or capability in user_deny:
+        return False
+    return "*" in allow or capability in allow or "*" in user_allow or capability in user_allow
 
 
-def get_credentials() -> Optional[Credentials]:
-    """Get valid credentials, refreshing if necessary."""
-    creds = None
+def _require_google():
+    """Exit with install instructions if the Google API libraries are missing.
 
-    if TOKEN_FILE.exists():
-        creds = Credentials.from_authorized_user_file(str(TOKEN_FILE), SCOPES)
+    They're imported where they're used rather than at the top of the
+    module: importing them takes a few hundred ms, which commands that
+    never call the API shouldn't pay.
+    """
+    try:
+        import google_auth_oauthlib  # noqa: F401
+        import googleapiclient  # noqa: F401
+    except ImportError:
+        print("Google API libraries not installed. Run:")
+        print("pip install google-auth-oauthlib google-api-python-client")
+        sys.exit(1)
 
-    if creds and creds.expired and creds.refresh_token:
-        try:
-            creds.refresh(Request())
-            TOKEN_FILE.write_text(creds.to_json())
-        except Exception:
-            creds = None
 
-    return creds
+def get_credentials() -> Optional["Credentials"]:
+    """Get valid credentials, refreshing if necessary.
+
+    Goes through google_auth, which serializes refreshes so concurrent
+    callers share one, and reuses loaded credentials in-process.
+    """
+    _require_google()
+    import google_auth
+
+    return google_auth.get_credentials()
 
 
 def authenticate() -> dict:
@@ -119,6 +167,9 @@ def authenticate() -> dict:
             ],
         }
 
+    _require_google()
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     try:
         flow = InstalledAppFlow.from_client_secrets_file(str(CREDENTIALS_FILE), SCOPES)
         creds = flow.run_local_server(port=0)
@@ -132,53 +183,83 @@ def authenticate() -> dict:
 
 
 def get_service():
-    """Get authenticated Google Calendar service."""
-    creds = get_credentials()
-    if not creds or not creds.valid:
+    """Get authenticated Google Calendar service (built once per process)."""
+    global _service
+    if _service is None:
+        creds = get_credentials()
+        if not creds or not creds.valid:
+            return None
+        from googleapiclient.discovery import build
+
+        # Bundled discovery document; no cache lookup or discovery fetch
+        _service = build("calendar", "v3", credentials=creds, static_discovery=True, cache_discovery=False)
+    return _service
+
+
+def _parse_clock(time_part: str) -> Optional[tuple[int, int]]:
+    """Parse a time of day ("2pm", "14:00", "9:30 am") into (hour, minute)."""
+    m = _CLOCK_RE.fullmatch(time_part)
+    # A bare number ("14") means a day of the month to dateutil, so only
+    # take the fast path when there's a colon or am/pm
+    if m and (m.group(2) or m.group(3)):
+        hour, minute, meridiem = int(m.group(1)), int(m.group(2) or 0), m.group(3)
+        if meridiem and 1 <= hour <= 12 and minute < 60:
+            hour = hour % 12 + (12 if meridiem == "pm" else 0)
+            return hour, minute
+        if not meridiem and hour < 24 and minute < 60:
+            return hour, minute
+    try:
+        parsed = date_parser.parse(time_part)
+        return parsed.hour, parsed.minute
+    except Exception:
         return None
-    return build("calendar", "v3", credentials=creds)
 
 
 def parse_datetime(time_str: str) -> Optional[datetime]:
     """Parse time string into datetime."""
-    now = datetime.now()
-    time_str = time_str.lower().strip()
+    return _parse_datetime(time_str.lower().strip(), date.today())
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_datetime(time_str: str, today: date) -> Optional[datetime]:
+    """parse_datetime for a normalized string. Relative times only depend
+    on the day, so results are cached per (string, day)."""
+    now = datetime.combine(today, datetime.min.time())
+
+    # Fast path for "YYYY-MM-DD" / "YYYY-MM-DD HH:MM"
+    m = _ISO_RE.fullmatch(time_str)
+    if m:
+        try:
+            return datetime(
+                int(m.group(1)), int(m.group(2)), int(m.group(3)),
+                int(m.group(4) or 0), int(m.group(5) or 0),
+            )
+        except ValueError:
+            pass
 
     # Handle "tomorrow"
     if "tomorrow" in time_str:
         time_part = time_str.replace("tomorrow", "").replace("at", "").strip()
         base = now + timedelta(days=1)
         if time_part:
-            try:
-                parsed = date_parser.parse(time_part)
-                return base.replace(
-                    hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0
-                )
-            except Exception:
-                pass
+            clock = _parse_clock(time_part)
+            if clock:
+                return base.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
         return base.replace(hour=9, minute=0, second=0, microsecond=0)
 
     # Handle "next weekday"
-    weekdays = {
-        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-        "friday": 4, "saturday": 5, "sunday": 6,
-    }
-    for day_name, day_num in weekdays.items():
-        if f"next {day_name}" in time_str:
-            days_ahead = day_num - now.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            base = now + timedelta(days=days_ahead)
-            time_part = time_str.replace(f"next {day_name}", "").replace("at", "").strip()
-            if time_part:
-                try:
-                    parsed = date_parser.parse(time_part)
-                    return base.replace(
-                        hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0
-                    )
-                except Exception:
-                    pass
-            return base.replace(hour=9, minute=0, second=0, microsecond=0)
+    m = _NEXT_WEEKDAY_RE.search(time_str)
+    if m:
+        days_ahead = _WEEKDAYS[m.group(1)] - now.weekday()
+        if days_ahead <= 0:
+            days_ahead += 7
+        base = now + timedelta(days=days_ahead)
+        time_part = (time_str[:m.start()] + time_str[m.end():]).replace("at", "").strip()
+        if time_part:
+            clock = _parse_clock(time_part)
+            if clock:
+                return base.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+        return base.replace(hour=9, minute=0, second=0, microsecond=0)
 
     # Standard parsing
     try:
@@ -194,8 +275,9 @@ def list_events(days: int = 7) -> dict:
         return {"error": "Not authenticated. Run: python google_calendar.py auth"}
 
     try:
-        now = datetime.utcnow().isoformat() + "Z"
-        end = (datetime.utcnow() + timedelta(days=days)).isoformat() + "Z"
+        now_dt = datetime.now(timezone.utc).replace(microsecond=0)
+        now = now_dt.isoformat().replace("+00:00", "Z")
+        end = (now_dt + timedelta(days=days)).isoformat().replace("+00:00", "Z")
 
         events_result = (
             service.events()
@@ -206,8 +288,10 @@ def list_events(days: int = 7) -> dict:
                 maxResults=50,
                 singleEvents=True,
                 orderBy="startTime",
+                # Only the fields we format, not the full event resources
+                fields="items(id,summary,location,description,start,end)",
             )
-            .execute()
+            .execute(num_retries=NUM_RETRIES)
         )
 
         events = events_result.get("items", [])
@@ -215,19 +299,18 @@ def list_events(days: int = 7) -> dict:
         if not events:
             return {"events": [], "message": f"No events in the next {days} days"}
 
-        formatted = []
-        for event in events:
-            start = event["start"].get("dateTime", event["start"].get("date"))
-            end = event["end"].get("dateTime", event["end"].get("date"))
-
-            formatted.append({
+        # All-day events have a "date" instead of a "dateTime"
+        formatted = [
+            {
                 "id": event["id"],
                 "title": event.get("summary", "(No title)"),
-                "start": start,
-                "end": end,
+                "start": event["start"].get("dateTime") or event["start"].get("date"),
+                "end": event["end"].get("dateTime") or event["end"].get("date"),
                 "location": event.get("location"),
                 "description": event.get("description"),
-            })
+            }
+            for event in events
+        ]
 
         return {"events": formatted}
 
@@ -288,12 +371,12 @@ def main():
 
     if command == "auth":
         result = authenticate()
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "list":
         days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
         result = list_events(days)
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "add":
         if len(sys.argv) < 5:
@@ -301,7 +384,7 @@ def main():
             sys.exit(1)
         description = sys.argv[5] if len(sys.argv) > 5 else None
         result = add_event(sys.argv[2], sys.argv[3], sys.argv[4], description)
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     else:
         print(f"Unknown command: {command}")
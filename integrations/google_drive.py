@@ -3,7 +3,7 @@
 
 Usage:
     python google_drive.py list [query]           # List/search files
-    python google_drive.py read <file_id>         # Read file contents
+    python google_drive.py read <file_id> [...]   # Read file contents
     python google_drive.py info <file_id>         # Get file metadata
     python google_drive.py create "<name>" "<content>" [--type doc|sheet|text]
     python google_drive.py update <file_id> "<content>"
@@ -12,50 +12,75 @@ Requires:
     - Run google_calendar.py auth first (shares credentials)
 """
 
-import json
+import io
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+from utils import print_json
 
-try:
+if TYPE_CHECKING:
     from google.oauth2.credentials import Credentials
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaIoBaseDownload, MediaInMemoryUpload
-except ImportError:
-    print("Google API libraries not installed. Run:")
-    print("pip install google-auth-oauthlib google-api-python-client")
-    sys.exit(1)
 
-import io
+# Built on first use and reused for later calls
+_service = None
+
+# file ID -> MIME type seen in earlier metadata lookups; a file's type
+# doesn't change, so update_file can skip its lookup for these
+_mime_cache: dict[str, str] = {}
+
+# Retries (with exponential backoff) for reads that hit a 429 or 5xx
+NUM_RETRIES = 3
+
+# Most sub-requests Drive accepts in one batch request
+BATCH_SIZE = 100
+
+# Characters of file content returned by read_file
+MAX_CONTENT_CHARS = 50000
+# Bytes downloaded for a text file: UTF-8 is at most 4 bytes/char, so this
+# always decodes to more than MAX_CONTENT_CHARS when the file is longer
+DOWNLOAD_BYTES = (MAX_CONTENT_CHARS + 1) * 4
+# Uploads above this size use a resumable session; smaller ones go up in a
+# single multipart request
+RESUMABLE_UPLOAD_BYTES = 5 * 1024 * 1024
 
-from config import STATE_DIR
 
-TOKEN_FILE = STATE_DIR / "google_token.json"
+def _require_google():
+    """Exit with install instructions if the Google API libraries are missing
+    (they're imported lazily, where used, to keep CLI startup fast)."""
+    try:
+        import google_auth_oauthlib  # noqa: F401
+        import googleapiclient  # noqa: F401
+    except ImportError:
+        print("Google API libraries not installed. Run:")
+        print("pip install google-auth-oauthlib google-api-python-client")
+        sys.exit(1)
 
-SCOPES = [
-    "https://www.googleapis.com/auth/calendar",
-    "https://www.googleapis.com/auth/drive",
-    "https://www.googleapis.com/auth/gmail.readonly",
-]
 
+def get_credentials() -> Optional["Credentials"]:
+    """Get valid credentials (shared with calendar).
 
-def get_credentials() -> Optional[Credentials]:
-    """Get valid credentials (shared with calendar)."""
-    if not TOKEN_FILE.exists():
-        return None
+    Goes through google_auth, which refreshes an expired token once and
+    saves it for later runs, and reuses loaded credentials in-process.
+    """
+    _require_google()
+    import google_auth
 
-    creds = Credentials.from_authorized_user_file(str(TOKEN_FILE), SCOPES)
-    if creds and creds.valid:
-        return creds
-    return None
+    return google_auth.get_credentials()
 
 
 def get_service():
-    """Get authenticated Drive service."""
-    creds = get_credentials()
-    if not creds:
-        return None
-    return build("drive", "v3", credentials=creds)
+    """Get authenticated Drive service (built once per process)."""
+    global _service
+    if _service is None:
+        creds = get_credentials()
+        if not creds:
+            return None
+        from googleapiclient.discovery import build
+
+        # Bundled discovery document; no cache lookup or discovery fetch
+        _service = build("drive", "v3", credentials=creds, static_discovery=True, cache_discovery=False)
+    return _service
 
 
 def list_files(query: Optional[str] = None, max_results: int = 20) -> dict:
@@ -68,8 +93,10 @@ def list_files(query: Optional[str] = None, max_results: int = 20) -> dict:
         # Build query
         q = None
         if query:
-            # Search in name and full text
-            q = f"name contains '{query}' or fullText contains '{query}'"
+            # Search in name and full text; quotes and backslashes in the
+            # search text must be escaped inside the query's string literal
+            safe = query.replace("\\", "\\\\").replace("'", "\\'")
+            q = f"name contains '{safe}' or fullText contains '{safe}'"
 
         results = (
             service.files()
@@ -79,7 +106,7 @@ def list_files(query: Optional[str] = None, max_results: int = 20) -> dict:
                 fields="files(id, name, mimeType, modifiedTime, size, webViewLink)",
                 orderBy="modifiedTime desc",
             )
-            .execute()
+            .execute(num_retries=NUM_RETRIES)
         )
 
         files = results.get("files", [])
@@ -104,58 +131,114 @@ def list_files(query: Optional[str] = None, max_results: int = 20) -> dict:
         return {"error": str(e)}
 
 
-def read_file(file_id: str) -> dict:
-    """Read file contents."""
+def _read_content(service, file_id: str, name: Optional[str], mime_type: str) -> dict:
+    """Read a file's contents once its name and MIME type are known."""
+    # Handle Google Docs/Sheets/Slides - export as text
+    if mime_type == "application/vnd.google-apps.document":
+        response = service.files().export(fileId=file_id, mimeType="text/plain").execute(num_retries=NUM_RETRIES)
+        content = response.decode("utf-8") if isinstance(response, bytes) else response
+
+    elif mime_type == "application/vnd.google-apps.spreadsheet":
+        response = service.files().export(fileId=file_id, mimeType="text/csv").execute(num_retries=NUM_RETRIES)
+        content = response.decode("utf-8") if isinstance(response, bytes) else response
+
+    elif mime_type == "application/vnd.google-apps.presentation":
+        response = service.files().export(fileId=file_id, mimeType="text/plain").execute(num_retries=NUM_RETRIES)
+        content = response.decode("utf-8") if isinstance(response, bytes) else response
+
+    elif mime_type.startswith("text/") or mime_type == "application/json":
+        # Regular text files - download directly
+        from googleapiclient.http import MediaIoBaseDownload
+
+        request = service.files().get_media(fileId=file_id)
+        fh = io.BytesIO()
+        # Only the head is returned, so fetch just that in one ranged request
+        downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_BYTES)
+        done = False
+        while not done and fh.tell() < DOWNLOAD_BYTES:
+            _, done = downloader.next_chunk(num_retries=NUM_RETRIES)
+        content = fh.getbuffer()[:DOWNLOAD_BYTES].tobytes().decode("utf-8", errors="replace")
+
+    else:
+        return {
+            "error": f"Cannot read file type: {mime_type}",
+            "name": name,
+            "suggestion": "Use the webViewLink to view in browser",
+        }
+
+    return {
+        "name": name,
+        "type": mime_type,
+        "content": content[:MAX_CONTENT_CHARS],  # Limit size
+        "truncated": len(content) > MAX_CONTENT_CHARS,
+    }
+
+
+def read_file(file_id: str, mime_hint: Optional[str] = None) -> dict:
+    """Read file contents.
+
+    Args:
+        file_id: Drive file ID
+        mime_hint: The file's full MIME type, if already known; skips the
+            metadata lookup (the result's name is then None)
+    """
     service = get_service()
     if not service:
         return {"error": "Not authenticated. Run: python google_calendar.py auth"}
 
     try:
-        # Get file metadata first
-        file_meta = service.files().get(fileId=file_id, fields="name, mimeType").execute()
-        mime_type = file_meta.get("mimeType", "")
-        name = file_meta.get("name", "")
+        if mime_hint:
+            name, mime_type = None, mime_hint
+        else:
+            # Get file metadata first
+            file_meta = service.files().get(fileId=file_id, fields="name, mimeType").execute(num_retries=NUM_RETRIES)
+            mime_type = file_meta.get("mimeType", "")
+            name = file_meta.get("name", "")
+            _mime_cache[file_id] = mime_type
 
-        # Handle Google Docs/Sheets/Slides - export as text
-        if mime_type == "application/vnd.google-apps.document":
-            response = service.files().export(fileId=file_id, mimeType="text/plain").execute()
-            content = response.decode("utf-8") if isinstance(response, bytes) else response
+        return _read_content(service, file_id, name, mime_type)
 
-        elif mime_type == "application/vnd.google-apps.spreadsheet":
-            response = service.files().export(fileId=file_id, mimeType="text/csv").execute()
-            content = response.decode("utf-8") if isinstance(response, bytes) else response
-
-        elif mime_type == "application/vnd.google-apps.presentation":
-            response = service.files().export(fileId=file_id, mimeType="text/plain").execute()
-            content = response.decode("utf-8") if isinstance(response, bytes) else response
-
-        elif mime_type.startswith("text/") or mime_type == "application/json":
-            # Regular text files - download directly
-            request = service.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-            content = fh.getvalue().decode("utf-8")
+    except Exception as e:
+        return {"error": str(e)}
 
-        else:
-            return {
-                "error": f"Cannot read file type: {mime_type}",
-                "name": name,
-                "suggestion": "Use the webViewLink to view in browser",
-            }
 
-        return {
-            "name": name,
-            "type": mime_type,
-            "content": content[:50000],  # Limit size
-            "truncated": len(content) > 50000,
-        }
+def read_files(file_ids: list[str]) -> dict:
+    """Read several files, fetching their metadata in batched requests."""
+    service = get_service()
+    if not service:
+        return {"error": "Not authenticated. Run: python google_calendar.py auth"}
+
+    file_ids = list(dict.fromkeys(file_ids))  # Batch request IDs must be unique
+    metas = {}
 
+    def on_meta(request_id, response, exception):
+        # Keep per-file failures (e.g. a bad ID) rather than failing them all
+        metas[request_id] = exception if exception is not None else response
+
+    try:
+        for start in range(0, len(file_ids), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_meta)
+            for file_id in file_ids[start:start + BATCH_SIZE]:
+                batch.add(service.files().get(fileId=file_id, fields="name, mimeType"), request_id=file_id)
+            batch.execute()
     except Exception as e:
         return {"error": str(e)}
 
+    files = []
+    for file_id in file_ids:
+        meta = metas[file_id]
+        if isinstance(meta, Exception):
+            result = {"error": str(meta)}
+        else:
+            _mime_cache[file_id] = meta.get("mimeType", "")
+            try:
+                result = _read_content(service, file_id, meta.get("name", ""), meta.get("mimeType", ""))
+            except Exception as e:
+                result = {"error": str(e)}
+        files.append({"id": file_id, **result})
+
+    return {"files": files, "count": len(files)}
+
 
 def get_file_info(file_id: str) -> dict:
     """Get detailed file metadata."""
@@ -170,9 +253,10 @@ def get_file_info(file_id: str) -> dict:
                 fileId=file_id,
                 fields="id, name, mimeType, modifiedTime, createdTime, size, webViewLink, owners, shared",
             )
-            .execute()
+            .execute(num_retries=NUM_RETRIES)
         )
 
+        _mime_cache[file_id] = file_meta["mimeType"]
         return {
             "id": file_meta["id"],
             "name": file_meta["name"],
@@ -201,7 +285,12 @@ def create_file(name: str, content: str, file_type: str = "doc") -> dict:
     if not service:
         return {"error": "Not authenticated. Run: python google_calendar.py auth"}
 
+    from googleapiclient.http import MediaInMemoryUpload
+
     try:
+        data = content.encode("utf-8")
+        resumable = len(data) > RESUMABLE_UPLOAD_BYTES
+
         if file_type == "doc":
             # Create Google Doc
             file_metadata = {
@@ -210,9 +299,9 @@ def create_file(name: str, content: str, file_type: str = "doc") -> dict:
             }
             # Upload as plain text, Google converts to Doc
             media = MediaInMemoryUpload(
-                content.encode("utf-8"),
+                data,
                 mimetype="text/plain",
-                resumable=True,
+                resumable=resumable,
             )
         elif file_type == "sheet":
             # Create Google Sheet (content should be CSV)
@@ -221,17 +310,17 @@ def create_file(name: str, content: str, file_type: str = "doc") -> dict:
                 "mimeType": "application/vnd.google-apps.spreadsheet",
             }
             media = MediaInMemoryUpload(
-                content.encode("utf-8"),
+                data,
                 mimetype="text/csv",
-                resumable=True,
+                resumable=resumable,
             )
         else:
             # Plain text file
             file_metadata = {"name": name}
             media = MediaInMemoryUpload(
-                content.encode("utf-8"),
+                data,
                 mimetype="text/plain",
-                resumable=True,
+                resumable=resumable,
             )
 
         file = (
@@ -257,11 +346,15 @@ def update_file(file_id: str, content: str) -> dict:
     if not service:
         return {"error": "Not authenticated. Run: python google_calendar.py auth"}
 
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import MediaInMemoryUpload
+
     try:
         # Get current file type
-        file_meta = service.files().get(fileId=file_id, fields="mimeType, name").execute()
-        mime_type = file_meta.get("mimeType", "")
-        name = file_meta.get("name", "")
+        mime_type = _mime_cache.get(file_id)
+        if mime_type is None:
+            file_meta = service.files().get(fileId=file_id, fields="mimeType").execute(num_retries=NUM_RETRIES)
+            mime_type = _mime_cache[file_id] = file_meta.get("mimeType", "")
 
         # Determine upload mime type
         if mime_type == "application/vnd.google-apps.document":
@@ -271,10 +364,11 @@ def update_file(file_id: str, content: str) -> dict:
         else:
             upload_mime = "text/plain"
 
+        data = content.encode("utf-8")
         media = MediaInMemoryUpload(
-            content.encode("utf-8"),
+            data,
             mimetype=upload_mime,
-            resumable=True,
+            resumable=len(data) > RESUMABLE_UPLOAD_BYTES,
         )
 
         file = (
@@ -290,6 +384,10 @@ def update_file(file_id: str, content: str) -> dict:
             "link": file.get("webViewLink"),
         }
 
+    except HttpError as e:
+        if e.resp.status == 404:
+            _mime_cache.pop(file_id, None)  # Deleted (or never existed)
+        return {"error": str(e)}
     except Exception as e:
         return {"error": str(e)}
 
@@ -306,21 +404,24 @@ def main():
     if command == "list":
         query = sys.argv[2] if len(sys.argv) > 2 else None
         result = list_files(query)
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "read":
         if len(sys.argv) < 3:
-            print("Usage: google_drive.py read <file_id>")
+            print("Usage: google_drive.py read <file_id> [<file_id>...]")
             sys.exit(1)
-        result = read_file(sys.argv[2])
-        print(json.dumps(result, indent=2))
+        if len(sys.argv) > 3:
+            result = read_files(sys.argv[2:])
+        else:
+            result = read_file(sys.argv[2])
+        print_json(result)
 
     elif command == "info":
         if len(sys.argv) < 3:
             print("Usage: google_drive.py info <file_id>")
             sys.exit(1)
         result = get_file_info(sys.argv[2])
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "create":
         if len(sys.argv) < 4:
@@ -334,14 +435,14 @@ def main():
             if idx + 1 < len(sys.argv):
                 file_type = sys.argv[idx + 1]
         result = create_file(name, content, file_type)
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     elif command == "update":
         if len(sys.argv) < 4:
             print("Usage: google_drive.py update <file_id> <content>")
             sys.exit(1)
         result = update_file(sys.argv[2], sys.argv[3])
-        print(json.dumps(result, indent=2))
+        print_json(result)
 
     else:
         print(f"Unknown command: {command}")
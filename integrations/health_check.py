@@ -6,18 +6,21 @@ Runs periodically, fixes what it can, alerts only when intervention needed.
 
 import argparse
 import asyncio
+import functools
 import json
 import os
 import pwd
-import subprocess
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
 
+import dm
+from utils import read_json, write_json
+
 # Paths
 STATE_DIR = Path("/home/iris/executive-assistant/workspace/state")
 HEALTH_STATE = STATE_DIR / "health_state.json"
-DM_QUEUE = STATE_DIR / "dm_queue.json"
 RESPONSE_STATS = STATE_DIR / "response_stats.json"
 
 # Critical paths that must be owned by iris
@@ -31,14 +34,25 @@ CRITICAL_PATHS = [
 # Samuel's Discord ID
 SAMUEL_ID = "672500045249249328"
 
+# Matches the bot's command line (arguments are NUL-separated in /proc)
+BOT_CMDLINE_RE = re.compile(rb"python.*bot\.py")
+
+# Seconds to wait for the Claude CLI to answer
+CLAUDE_TIMEOUT = 30
+
+# Health state as last read or written (see _state_key), so a check that
+# changes nothing but the timestamp doesn't rewrite the file
+_persisted_state = None
+
 
 def log(msg: str):
     """Print timestamped log message."""
     print(f"[{datetime.now().isoformat()}] {msg}")
 
 
+@functools.lru_cache(maxsize=1)
 def get_iris_uid_gid():
-    """Get iris user's UID and GID."""
+    """Get iris user's UID and GID (looked up once per process)."""
     try:
         pw = pwd.getpwnam("iris")
         return pw.pw_uid, pw.pw_gid
@@ -46,14 +60,13 @@ def get_iris_uid_gid():
         return None, None
 
 
-def check_file_ownership(path: Path) -> tuple[bool, str]:
+def check_file_ownership(path: Path, iris_uid: int) -> tuple[bool, str]:
     """Check if file is owned by iris. Returns (ok, message)."""
-    if not path.exists():
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
         return True, f"{path} doesn't exist (ok)"
 
-    stat = path.stat()
-    iris_uid, iris_gid = get_iris_uid_gid()
-
     if iris_uid is None:
         return False, "Could not find iris user"
 
@@ -63,9 +76,8 @@ def check_file_ownership(path: Path) -> tuple[bool, str]:
     return True, f"{path} ownership ok"
 
 
-def fix_file_ownership(path: Path) -> tuple[bool, str]:
+def fix_file_ownership(path: Path, iris_uid: int, iris_gid: int) -> tuple[bool, str]:
     """Fix file ownership to iris:iris. Returns (success, message)."""
-    iris_uid, iris_gid = get_iris_uid_gid()
     if iris_uid is None:
         return False, "Could not find iris user"
 
@@ -79,16 +91,23 @@ def fix_file_ownership(path: Path) -> tuple[bool, str]:
 
 
 def check_bot_running() -> tuple[bool, str]:
-    """Check if bot process is running."""
+    """Check if bot process is running.
+
+    Scans /proc for a matching command line directly - what `pgrep -f`
+    would do, without forking it.
+    """
     try:
-        result = subprocess.run(
-            ["pgrep", "-f", "python.*bot.py"],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
-            pids = result.stdout.strip().split('\n')
-            return True, f"Bot running (PID: {pids[0]})"
+        with os.scandir("/proc") as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                        cmdline = f.read()
+                except OSError:  # Exited, or not ours to read
+                    continue
+                if BOT_CMDLINE_RE.search(cmdline):
+                    return True, f"Bot running (PID: {entry.name})"
         return False, "Bot not running"
     except Exception as e:
         return False, f"Error checking bot: {e}"
@@ -96,11 +115,11 @@ def check_bot_running() -> tuple[bool, str]:
 
 def check_response_stats() -> tuple[bool, str]:
     """Check recent response success rate."""
-    if not RESPONSE_STATS.exists():
-        return True, "No response stats yet"
-
     try:
-        stats = json.loads(RESPONSE_STATS.read_text())
+        stats = read_json(RESPONSE_STATS)
+        if stats is None:
+            return True, "No response stats yet"
+
         recent = stats.get("recent", [])
 
         if len(recent) < 3:
@@ -120,75 +139,92 @@ def check_response_stats() -> tuple[bool, str]:
         return True, f"Could not check stats: {e}"
 
 
-def check_claude_cli() -> tuple[bool, str]:
+async def check_claude_cli() -> tuple[bool, str]:
     """Test that Claude CLI responds."""
     try:
         # Run directly - we're already running as iris
         # Use full path since cron doesn't have ~/.local/bin in PATH
         claude_path = "/home/iris/.local/bin/claude"
-        result = subprocess.run(
-            ["timeout", "30", claude_path, "--print", "--output-format", "text",
-             "-p", "respond with just the word: working"],
-            capture_output=True,
-            text=True,
-            timeout=35,
+        process = await asyncio.create_subprocess_exec(
+            claude_path, "--print", "--output-format", "text",
+            "-p", "respond with just the word: working",
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             env={**os.environ, "HOME": "/home/iris"}
         )
-
-        output = result.stdout.strip().lower()
-        if "working" in output:
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=CLAUDE_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return False, "Claude CLI timed out"
+
+        # Match on the raw bytes; only decode what goes into a message
+        if b"working" in stdout.lower():
             return True, "Claude CLI responding"
 
         # Check stderr for specific errors
-        if "permission denied" in result.stderr.lower():
-            return False, f"Claude CLI permission error: {result.stderr[:100]}"
-        if result.stderr:
-            return False, f"Claude CLI error: {result.stderr[:100]}"
+        if b"permission denied" in stderr.lower():
+            return False, f"Claude CLI permission error: {stderr[:100].decode(errors='replace')}"
+        if stderr:
+            return False, f"Claude CLI error: {stderr[:100].decode(errors='replace')}"
 
-        return False, f"Claude CLI unexpected response: {output[:100]}"
+        output = stdout.strip().lower()[:100].decode(errors="replace")
+        return False, f"Claude CLI unexpected response: {output}"
 
-    except subprocess.TimeoutExpired:
-        return False, "Claude CLI timed out"
     except Exception as e:
         return False, f"Claude CLI check failed: {e}"
 
 
 def queue_dm(message: str):
-    """Queue a DM to Samuel."""
-    queue = []
-    if DM_QUEUE.exists():
-        try:
-            queue = json.loads(DM_QUEUE.read_text())
-        except:
-            queue = []
-
-    queue.append({
-        "user_id": SAMUEL_ID,
-        "message": message,
-        "timestamp": datetime.now().isoformat()
-    })
+    """Queue a DM to Samuel.
 
-    DM_QUEUE.write_text(json.dumps(queue, indent=2))
+    Goes through dm.py, which appends one line to the JSONL queue the bot
+    polls (and migrates any old dm_queue.json) instead of rewriting it.
+    """
+    dm.queue_dm(SAMUEL_ID, message)
     log(f"Queued DM: {message[:50]}...")
 
 
+def _state_key(state: dict) -> str:
+    """Serialize state for change detection, ignoring the check time."""
+    return json.dumps({k: v for k, v in state.items() if k != "last_check"}, sort_keys=True)
+
+
 def load_health_state() -> dict:
     """Load previous health state."""
-    if HEALTH_STATE.exists():
-        try:
-            return json.loads(HEALTH_STATE.read_text())
-        except:
-            pass
+    global _persisted_state
+    try:
+        state = read_json(HEALTH_STATE)
+        if state is not None:
+            # An unchanged state is only touched on save, so the file's
+            # mtime is the time of the last check
+            state["last_check"] = datetime.fromtimestamp(HEALTH_STATE.stat().st_mtime).isoformat()
+            _persisted_state = _state_key(state)
+            return state
+    except:
+        pass
     return {"last_check": None, "issues": [], "alerts_sent": {}}
 
 
 def save_health_state(state: dict):
-    """Save health state."""
+    """Save health state, rewriting the file only if it changed."""
+    global _persisted_state
     state["last_check"] = datetime.now().isoformat()
-    HEALTH_STATE.write_text(json.dumps(state, indent=2))
+    key = _state_key(state)
+    if key == _persisted_state:
+        try:
+            os.utime(HEALTH_STATE)
+            return
+        except FileNotFoundError:
+            pass
+    # Compact: only this script reads it back (`status` pretty-prints it)
+    write_json(HEALTH_STATE, state, indent=False)
+    _persisted_state = key
 
 
-def run_health_check(alert: bool = True, fix: bool = True) -> dict:
+async def run_health_check(alert: bool = True, fix: bool = True) -> dict:
     """
     Run full health check.
 
@@ -210,12 +246,13 @@ def run_health_check(alert: bool = True, fix: bool = True) -> dict:
     }
 
     # Check file ownership
+    iris_uid, iris_gid = get_iris_uid_gid()
     for path in CRITICAL_PATHS:
-        ok, msg = check_file_ownership(path)
+        ok, msg = check_file_ownership(path, iris_uid)
         results["checks"].append({"check": f"ownership:{path}", "ok": ok, "message": msg})
 
         if not ok and fix:
-            fixed, fix_msg = fix_file_ownership(path)
+            fixed, fix_msg = fix_file_ownership(path, iris_uid, iris_gid)
             if fixed:
                 results["fixed"].append(fix_msg)
                 log(f"AUTO-FIX: {fix_msg}")
@@ -230,8 +267,17 @@ def run_health_check(alert: bool = True, fix: bool = True) -> dict:
                         results["alerts"].append(fix_msg)
                         state.setdefault("alerts_sent", {})[alert_key] = datetime.now().isoformat()
 
+    # The remaining checks are independent of each other, so run them
+    # concurrently - the Claude CLI check alone can take CLAUDE_TIMEOUT.
+    # It only runs if the ownership checks passed.
+    ownership_ok = all(c["ok"] for c in results["checks"] if c["check"].startswith("ownership:"))
+    checks = [asyncio.to_thread(check_bot_running), asyncio.to_thread(check_response_stats)]
+    if ownership_ok:
+        checks.append(check_claude_cli())
+    bot_result, stats_result, *claude_result = await asyncio.gather(*checks)
+
     # Check bot running
-    ok, msg = check_bot_running()
+    ok, msg = bot_result
     results["checks"].append({"check": "bot_running", "ok": ok, "message": msg})
     if not ok:
         results["all_ok"] = False
@@ -244,9 +290,8 @@ def run_health_check(alert: bool = True, fix: bool = True) -> dict:
                 state.setdefault("alerts_sent", {})[alert_key] = datetime.now().isoformat()
 
     # Check Claude CLI (only if ownership checks passed)
-    ownership_ok = all(c["ok"] for c in results["checks"] if c["check"].startswith("ownership:"))
     if ownership_ok:
-        ok, msg = check_claude_cli()
+        ok, msg = claude_result[0]
         results["checks"].append({"check": "claude_cli", "ok": ok, "message": msg})
         if not ok:
             results["all_ok"] = False
@@ -261,7 +306,7 @@ def run_health_check(alert: bool = True, fix: bool = True) -> dict:
         results["checks"].append({"check": "claude_cli", "ok": False, "message": "Skipped - ownership issues"})
 
     # Check response stats
-    ok, msg = check_response_stats()
+    ok, msg = stats_result
     results["checks"].append({"check": "response_stats", "ok": ok, "message": msg})
     if not ok:
         results["all_ok"] = False
@@ -320,10 +365,10 @@ def main():
                 print("No active alerts")
         return
 
-    results = run_health_check(
+    results = asyncio.run(run_health_check(
         alert=not args.no_alert,
         fix=not args.no_fix
-    )
+    ))
 
     if args.json:
         print(json.dumps(results, indent=2))
@@ -23,25 +23,59 @@ Usage:
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
 import os
-import re
 import subprocess
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
 from config import (
     WORKSPACE, STATE_DIR, INTEGRATIONS, VENV_PYTHON,
     TIMEZONE, ACTIVE_START, ACTIVE_END, SAMUEL_ID,
     now_local, is_active_hours
 )
+from utils import (
+    append_jsonl, file_lock, read_json, read_jsonl, read_legacy_json, write_json, write_jsonl
+)
+
+# Stdlib-only integrations, called in-process rather than spawning an
+# interpreter each; the rest need the venv's third-party packages
+import activity
+import dm
+import tasks
 
 HEARTBEAT_FILE = WORKSPACE / "HEARTBEAT.md"
 STATE_FILE = STATE_DIR / "heartbeat.json"
 LOG_FILE = STATE_DIR / "heartbeat.log"
 
+# Background completions are appended one per line; relayed IDs go to a
+# separate log so marking them relayed doesn't rewrite the completions.
+COMPLETIONS_FILE = STATE_DIR / "background_completions.jsonl"
+RELAYED_FILE = STATE_DIR / "background_completions_relayed.log"
+LEGACY_COMPLETIONS_FILE = STATE_DIR / "background_completions.json"
+# Serializes completion log writers across processes (compaction replaces
+# the log file, so it can't carry the lock)
+COMPLETIONS_LOCK_FILE = STATE_DIR / "background_completions.lock"
+
+# Only the most recent completions are relayed or kept
+MAX_COMPLETIONS = 20
+# Rewrite the completions log down to MAX_COMPLETIONS once it's this big
+COMPACT_BYTES = 64 * 1024
+
 HEARTBEAT_OK = "HEARTBEAT_OK"
+_HEARTBEAT_OK_LOWER = HEARTBEAT_OK.lower()
+
+# HEARTBEAT.md contents, reused while the file's mtime is unchanged
+_heartbeat_md: str = ""
+_heartbeat_md_mtime: Optional[int] = None
+
+# Environment for the claude CLI: ensure it's in PATH (it's at
+# /home/iris/.local/bin/claude); built once rather than per call
+_CLAUDE_ENV = {**os.environ, "PATH": "/home/iris/.local/bin:" + os.environ.get("PATH", "")}
 
 
 def log(message: str):
@@ -55,11 +89,9 @@ def log(message: str):
 
 def load_state() -> dict:
     """Load heartbeat state."""
-    if STATE_FILE.exists():
-        try:
-            return json.loads(STATE_FILE.read_text())
-        except json.JSONDecodeError:
-            pass
+    state = read_json(STATE_FILE)
+    if state is not None:
+        return state
     return {
         "last_check": None,
         "last_alert": None,
@@ -71,106 +103,136 @@ def load_state() -> dict:
 def save_state(state: dict):
     """Save heartbeat state."""
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(state, indent=2, default=str))
+    # Compact: machine-read only (`status` formats it for display)
+    write_json(STATE_FILE, state, indent=False)
 
 
 def load_heartbeat_md() -> str:
-    """Load the heartbeat checklist."""
-    if HEARTBEAT_FILE.exists():
-        return HEARTBEAT_FILE.read_text()
-    return ""
+    """Load the heartbeat checklist (re-read only when the file's mtime changes)."""
+    global _heartbeat_md, _heartbeat_md_mtime
+    try:
+        mtime = HEARTBEAT_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ""
+    if mtime != _heartbeat_md_mtime:
+        _heartbeat_md, _heartbeat_md_mtime = HEARTBEAT_FILE.read_text(), mtime
+    return _heartbeat_md
 
 
 def save_heartbeat_md(content: str):
-    """Save the heartbeat checklist."""
-    HEARTBEAT_FILE.write_text(content)
+    """Save the heartbeat checklist (temp file + rename, so a crash can't truncate it)."""
+    global _heartbeat_md, _heartbeat_md_mtime
+    tmp = HEARTBEAT_FILE.with_name(HEARTBEAT_FILE.name + ".tmp")
+    tmp.write_text(content)
+    mtime = tmp.stat().st_mtime_ns
+    os.replace(tmp, HEARTBEAT_FILE)
+    _heartbeat_md, _heartbeat_md_mtime = content, mtime
+
 
+async def run_integration(script: str, *args, timeout: int = 30) -> tuple[bool, str]:
+    """Run an integration script and return (success, output).
 
-def run_integration(script: str, *args, timeout: int = 30) -> tuple[bool, str]:
-    """Run an integration script and return (success, output)."""
+    The process is killed if it times out.
+    """
     script_path = INTEGRATIONS / script
     if not script_path.exists():
         return False, f"Script not found: {script}"
 
     try:
-        result = subprocess.run(
-            [str(VENV_PYTHON), str(script_path), *args],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+        process = await asyncio.create_subprocess_exec(
+            str(VENV_PYTHON), str(script_path), *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             cwd=str(WORKSPACE)
         )
-        return result.returncode == 0, result.stdout.strip()
-    except subprocess.TimeoutExpired:
+    except Exception as e:
+        return False, str(e)
+
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
         return False, "Timeout"
+
+    return process.returncode == 0, stdout.decode().strip()
+
+
+async def run_local(func, *args) -> tuple[bool, str]:
+    """Call an in-process integration in a worker thread.
+
+    Returns (success, output) like run_integration, with the output the
+    script's CLI would have printed.
+    """
+    try:
+        result = await asyncio.to_thread(func, *args)
     except Exception as e:
         return False, str(e)
+    return True, json.dumps(result, indent=2)
 
 
-def gather_context() -> dict:
-    """Gather context from various integrations."""
+async def gather_context(now: Optional[datetime] = None) -> dict:
+    """Gather context from various integrations (as of now, default: the current time)."""
+    if now is None:
+        now = now_local()
     context = {
-        "timestamp": now_local().isoformat(),
-        "is_active_hours": is_active_hours(),
+        "timestamp": now.isoformat(),
+        "is_active_hours": ACTIVE_START <= now.hour < ACTIVE_END,
     }
 
+    # The integrations are independent, so run them all at once
+    reminders, calendar, todoist, email, recent, tracked = await asyncio.gather(
+        run_integration("reminders.py", "list", SAMUEL_ID),
+        run_integration("google_calendar.py", "list", "1"),
+        run_integration("todoist.py", "list"),
+        run_integration("gmail.py", "unread"),
+        run_local(activity.get_recent, 6),
+        run_local(tasks.check_tasks),
+    )
+
     # Reminders
-    success, output = run_integration("reminders.py", "list", SAMUEL_ID)
+    success, output = reminders
     if success and output:
         context["reminders"] = output
 
     # Calendar - next 6 hours
-    success, output = run_integration("google_calendar.py", "list", "1")
+    success, output = calendar
     if success and output:
         context["calendar"] = output
 
     # Todoist - due today
-    success, output = run_integration("todoist.py", "list")
+    success, output = todoist
     if success and output:
         context["todoist"] = output
 
     # Unread emails (just count, not content for privacy)
-    success, output = run_integration("gmail.py", "unread")
+    success, output = email
     if success and output:
         context["email_unread"] = output
 
     # Recent activity
-    success, output = run_integration("activity.py", "recent", "6")
+    success, output = recent
     if success and output:
         context["recent_activity"] = output[:1000]  # Truncate
 
     # Tracked tasks (commitments Samuel made)
-    success, output = run_integration("tasks.py", "check", "--json")
+    success, output = tracked
     if success and output:
         context["tracked_tasks"] = output
 
     # Background task completions waiting to be relayed
-    completions_file = STATE_DIR / "background_completions.json"
-    if completions_file.exists():
-        try:
-            completions = json.loads(completions_file.read_text())
-            pending = [c for c in completions.get("completions", []) if not c.get("relayed")]
-            if pending:
-                context["background_completions"] = pending
-        except:
-            pass
-
-    # Check queues
-    dm_queue = STATE_DIR / "dm_queue.json"
-    if dm_queue.exists():
-        try:
-            queue = json.loads(dm_queue.read_text())
-            context["dm_queue_size"] = len(queue.get("queue", []))
-        except:
-            pass
-
-    channel_queue = STATE_DIR / "channel_message_queue.json"
-    if channel_queue.exists():
-        try:
-            queue = json.loads(channel_queue.read_text())
-            context["channel_queue_size"] = len(queue.get("queue", []))
-        except:
-            pass
+    pending = [c for c in load_completions() if not c.get("relayed")]
+    if pending:
+        context["background_completions"] = pending
+
+    # Check queues (count the unsent messages)
+    try:
+        context["dm_queue_size"] = dm.count_pending()
+    except OSError:
+        pass
+
+    channel_queue = read_json(STATE_DIR / "channel_message_queue.json", [])
+    context["channel_queue_size"] = sum(1 for m in channel_queue if not m.get("sent"))
 
     return context
 
@@ -178,10 +240,6 @@ def gather_context() -> dict:
 def run_claude(prompt: str, timeout: int = 180) -> str:
     """Run a prompt through Claude CLI using stdin to avoid arg length limits."""
     try:
-        # Ensure claude is in PATH - it's at /home/iris/.local/bin/claude
-        env = os.environ.copy()
-        env["PATH"] = "/home/iris/.local/bin:" + env.get("PATH", "")
-
         result = subprocess.run(
             ["claude", "-p", "-", "--output-format", "text"],
             input=prompt,
@@ -189,7 +247,7 @@ def run_claude(prompt: str, timeout: int = 180) -> str:
             text=True,
             timeout=timeout,
             cwd=str(WORKSPACE),
-            env=env
+            env=_CLAUDE_ENV
         )
         return result.stdout.strip() if result.returncode == 0 else f"Error: {result.stderr}"
     except subprocess.TimeoutExpired:
@@ -203,72 +261,123 @@ def extract_response(text: str) -> tuple[bool, str]:
 
     Returns (is_ok, message).
     """
-    # Strip markdown code blocks if present
-    text = re.sub(r'^```\w*\n?', '', text)
-    text = re.sub(r'\n?```$', '', text)
+    # Strip markdown code blocks if present (opening line with any language tag)
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.partition("\n")[2]
+    if text.endswith("```"):
+        text = text[:-3]
     text = text.strip()
 
     # Check for HEARTBEAT_OK (case insensitive, might have extra text)
-    if HEARTBEAT_OK.lower() in text.lower():
+    if _HEARTBEAT_OK_LOWER in text.lower():
         return True, ""
 
     return False, text
 
 
-def is_duplicate_alert(message: str, state: dict) -> bool:
-    """Check if this alert was recently sent (within 24h)."""
-    # Simple hash of first 100 chars
-    msg_hash = hash(message[:100])
+def _msg_key(message: str) -> str:
+    """Dedup key for an alert: a hash of its first 100 chars.
+
+    Unlike hash(), this is the same in every process, so alerts recorded
+    by one heartbeat run still match in the next.
+    """
+    return hashlib.blake2b(message[:100].encode("utf-8"), digest_size=8).hexdigest()
+
+
+def is_duplicate_alert(message: str, state: dict, now: Optional[datetime] = None) -> bool:
+    """Check if this alert was recently sent (within 24h of now)."""
+    msg_hash = _msg_key(message)
     recent = state.get("recent_alerts", [])
 
-    cutoff = (now_local() - timedelta(hours=24)).isoformat()
+    cutoff = ((now or now_local()) - timedelta(hours=24)).isoformat()
 
-    for alert in recent:
-        if alert.get("hash") == msg_hash and alert.get("time", "") > cutoff:
+    # record_alert appends, so the list is oldest first: scan from the newest
+    # and stop at the first alert older than the cutoff
+    for alert in reversed(recent):
+        if alert["time"] <= cutoff:
+            break
+        if alert["hash"] == msg_hash:
             return True
 
     return False
 
 
-def record_alert(message: str, state: dict):
-    """Record that we sent this alert."""
-    msg_hash = hash(message[:100])
+def record_alert(message: str, state: dict, now: Optional[datetime] = None):
+    """Record that we sent this alert (at now)."""
+    if now is None:
+        now = now_local()
+    msg_hash = _msg_key(message)
     recent = state.get("recent_alerts", [])
 
     # Add new alert
     recent.append({
         "hash": msg_hash,
-        "time": now_local().isoformat(),
+        "time": now.isoformat(),
         "preview": message[:50]
     })
 
     # Keep only last 24h
-    cutoff = (now_local() - timedelta(hours=24)).isoformat()
+    cutoff = (now - timedelta(hours=24)).isoformat()
     state["recent_alerts"] = [a for a in recent if a.get("time", "") > cutoff]
 
 
-def send_dm(message: str) -> bool:
+async def send_dm(message: str) -> bool:
     """Send a DM to Samuel via the queue."""
-    success, output = run_integration("dm.py", "send", "samuel", message)
-    return success
+    result = await asyncio.to_thread(dm.queue_dm, "samuel", message)
+    return "error" not in result
 
 
-def check_heartbeat():
-    """Run a heartbeat check."""
-    state = load_state()
-    heartbeat_md = load_heartbeat_md()
+# Context entries that can need attention on their own (recent activity is
+# only background for the model)
+SIGNAL_KEYS = ("reminders", "calendar", "todoist", "email_unread", "tracked_tasks")
 
-    if not heartbeat_md.strip():
-        log("HEARTBEAT.md is empty, skipping check")
-        return
 
-    log("Starting heartbeat check...")
+def _has_items(output: str) -> bool:
+    """Whether an integration's JSON output lists anything.
+
+    e.g. "[]" or {"events": [], "message": "..."} are empty; errors count as empty.
+    """
+    try:
+        data = json.loads(output)
+    except ValueError:
+        return bool(output.strip())
+    if isinstance(data, dict):
+        return any(isinstance(v, (list, dict)) and v for v in data.values())
+    return bool(data)
+
+
+def has_signal(context: dict) -> bool:
+    """Whether the gathered context holds anything that might need attention."""
+    return (
+        any(_has_items(context[k]) for k in SIGNAL_KEYS if k in context)
+        or bool(context.get("background_completions"))
+        or bool(context.get("dm_queue_size"))
+        or bool(context.get("channel_queue_size"))
+    )
+
+
+def has_active_items(heartbeat_md: str) -> bool:
+    """Whether the Active Items section of HEARTBEAT.md lists any items."""
+    marker = "## Active Items"
+    if marker not in heartbeat_md:
+        return False
+    for line in heartbeat_md.split(marker, 1)[1].splitlines():
+        if line.startswith("##"):
+            break
+        if line.lstrip().startswith(("- ", "* ")):
+            return True
+    return False
 
-    # Gather context
-    context = gather_context()
 
-    # Build prompt
-    prompt = f"""You are Iris running a heartbeat check. Review the checklist and context, then decide what (if anything) needs Samuel's attention.
+def build_prompt(heartbeat_md: str, context: dict) -> str:
+    """Build the heartbeat prompt."""
+    # Compact JSON; the model doesn't need it indented
+    completions = context.get("background_completions")
+    completions_text = (
+        json.dumps(completions, separators=(",", ":")) if completions else "None pending"
+    )
+    return f"""You are Iris running a heartbeat check. Review the checklist and context, then decide what (if anything) needs Samuel's attention.
 
 ## Your Heartbeat Checklist
 {heartbeat_md}
@@ -300,7 +409,7 @@ def check_heartbeat():
 {context.get('tracked_tasks', 'None')}
 
 ### Background Task Completions
-{json.dumps(context.get('background_completions', []), indent=2) if context.get('background_completions') else 'None pending'}
+{completions_text}
 
 ## Instructions
 
@@ -316,8 +425,35 @@ Remember: This runs every 2 hours. Only surface things that are:
 
 Do NOT surface routine information like "you have 3 tasks due today" unless they're overdue or urgent."""
 
+
+async def check_heartbeat():
+    """Run a heartbeat check."""
+    state = load_state()
+    heartbeat_md = load_heartbeat_md()
+
+    if not heartbeat_md.strip():
+        log("HEARTBEAT.md is empty, skipping check")
+        return
+
+    log("Starting heartbeat check...")
+
+    # One timestamp for the whole run, so the context, dedup cutoff and
+    # recorded times all agree
+    run_now = now_local()
+    run_now_iso = run_now.isoformat()
+
+    # Gather context
+    context = await gather_context(run_now)
+
+    # Nothing to review: skip the Claude call entirely
+    if not has_signal(context) and not has_active_items(heartbeat_md):
+        log("Heartbeat OK - nothing to review, skipped Claude")
+        state["last_check"] = run_now_iso
+        save_state(state)
+        return
+
     # Run through Claude
-    response = run_claude(prompt)
+    response = run_claude(build_prompt(heartbeat_md, context))
 
     if response.startswith("Error"):
         log(f"Claude error: {response}")
@@ -326,7 +462,7 @@ Do NOT surface routine information like "you have 3 tasks due today" unless they
     is_ok, message = extract_response(response)
 
     # Update state
-    state["last_check"] = now_local().isoformat()
+    state["last_check"] = run_now_iso
 
     if is_ok:
         log("Heartbeat OK - nothing to surface")
@@ -334,7 +470,7 @@ Do NOT surface routine information like "you have 3 tasks due today" unless they
         return
 
     # Check for duplicates
-    if is_duplicate_alert(message, state):
+    if is_duplicate_alert(message, state, now=run_now):
         log(f"Duplicate alert suppressed: {message[:50]}...")
         save_state(state)
         return
@@ -342,9 +478,9 @@ Do NOT surface routine information like "you have 3 tasks due today" unless they
     # Send the alert
     log(f"Surfacing: {message[:100]}...")
 
-    if send_dm(message):
-        state["last_alert"] = now_local().isoformat()
-        record_alert(message, state)
+    if await send_dm(message):
+        state["last_alert"] = run_now_iso
+        record_alert(message, state, now=run_now)
         log("Alert sent successfully")
     else:
         log("Failed to send alert")
@@ -458,52 +594,84 @@ def wake_heartbeat(reason: str = "manual"):
     save_state(state)
 
     log(f"Wake triggered: {reason}")
-    check_heartbeat()
+    asyncio.run(check_heartbeat())
     return {"status": "executed", "reason": reason}
 
 
-def record_completion(task_id: str, result: str, task_type: str = "background"):
-    """Record a background task completion for the next heartbeat to relay."""
-    completions_file = STATE_DIR / "background_completions.json"
+def completions_lock():
+    """Hold the exclusive completions log lock."""
+    return file_lock(COMPLETIONS_LOCK_FILE)
 
-    if completions_file.exists():
-        try:
-            data = json.loads(completions_file.read_text())
-        except:
-            data = {"completions": []}
-    else:
-        data = {"completions": []}
-
-    data["completions"].append({
-        "id": task_id,
-        "type": task_type,
-        "result": result[:500],  # Truncate long results
-        "completed_at": now_local().isoformat(),
-        "relayed": False,
-    })
 
-    # Keep only last 20 completions
-    data["completions"] = data["completions"][-20:]
+def migrate_legacy_completions() -> None:
+    """Move completions from the old whole-file JSON into the JSONL log.
+
+    Callers must hold completions_lock().
+    """
+    legacy = read_legacy_json(LEGACY_COMPLETIONS_FILE)
+    if legacy is None:
+        return
+    completions = legacy.get("completions", [])
+    if completions:
+        append_jsonl(COMPLETIONS_FILE, completions)
+    LEGACY_COMPLETIONS_FILE.unlink(missing_ok=True)
+
+
+def _load_completions() -> list:
+    """load_completions for callers already holding completions_lock()."""
+    migrate_legacy_completions()
+    completions = read_jsonl(COMPLETIONS_FILE)[-MAX_COMPLETIONS:]
+    try:
+        relayed = set(RELAYED_FILE.read_text().splitlines())
+    except FileNotFoundError:
+        relayed = set()
+    for completion in completions:
+        if completion.get("id") in relayed:
+            completion["relayed"] = True
+    return completions
+
+
+def load_completions() -> list:
+    """Load the most recent completions, with relayed status filled in."""
+    with completions_lock():
+        return _load_completions()
+
+
+def compact_completions() -> None:
+    """Rewrite the completions log (last MAX_COMPLETIONS) and reset the relayed log.
+
+    Callers must hold completions_lock().
+    """
+    write_jsonl(COMPLETIONS_FILE, _load_completions())
+    # Only after the log is replaced, so a crash can't re-relay completions
+    RELAYED_FILE.unlink(missing_ok=True)
+
+
+def record_completion(task_id: str, result: str, task_type: str = "background"):
+    """Record a background task completion for the next heartbeat to relay."""
+    with completions_lock():
+        migrate_legacy_completions()
+        append_jsonl(COMPLETIONS_FILE, [{
+            "id": task_id,
+            "type": task_type,
+            "result": result[:500],  # Truncate long results
+            "completed_at": now_local().isoformat(),
+            "relayed": False,
+        }])
+
+        if COMPLETIONS_FILE.stat().st_size > COMPACT_BYTES:
+            compact_completions()
 
-    completions_file.write_text(json.dumps(data, indent=2))
     print(f"Recorded completion: {task_id}")
 
 
 def mark_relayed(task_ids: list):
     """Mark completions as relayed so they don't repeat."""
-    completions_file = STATE_DIR / "background_completions.json"
-
-    if not completions_file.exists():
+    if not task_ids:
         return
-
-    try:
-        data = json.loads(completions_file.read_text())
-        for completion in data.get("completions", []):
-            if completion["id"] in task_ids:
-                completion["relayed"] = True
-        completions_file.write_text(json.dumps(data, indent=2))
-    except:
-        pass
+    with completions_lock():
+        with open(RELAYED_FILE, "a") as f:
+            f.write("".join(f"{task_id}\n" for task_id in task_ids))
 
 
 def main():
@@ -545,7 +713,7 @@ def main():
     args = parser.parse_args()
 
     if args.command == "check":
-        check_heartbeat()
+        asyncio.run(check_heartbeat())
     elif args.command == "status":
         show_status()
     elif args.command == "add":
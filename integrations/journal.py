@@ -15,14 +15,47 @@ Entry types: observation, reflection, learning, intention, note (default: note)
 """
 
 import json
+import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from config import STATE_DIR
+from utils import (
+    append_jsonl, file_lock, read_json, read_jsonl, read_legacy_json, write_json, write_jsonl
+)
 
 JOURNAL_DIR = STATE_DIR / "journal"
 TRIGGERS_FILE = STATE_DIR / "journal_triggers.json"
+# Serializes converting old-format day files across processes
+MIGRATE_LOCK_FILE = STATE_DIR / "journal_migrate.lock"
+
+# Parsed JSON files: path -> ((st_mtime_ns, st_size), data), reused until
+# the file changes (e.g. journal_agent reads today's file for both the day
+# and the week)
+_json_cache: dict[Path, tuple[tuple[int, int], object]] = {}
+
+# Reflection prompts for the morning (before 12), afternoon (before 17) and evening
+REFLECTION_PROMPTS = (
+    (
+        "What's your intention for today?",
+        "What's on your mind this morning?",
+        "What would make today meaningful?",
+    ),
+    (
+        "What have you noticed so far today?",
+        "What's working? What isn't?",
+        "Any observations worth capturing?",
+    ),
+    (
+        "What did you learn today?",
+        "What are you grateful for?",
+        "What would you do differently tomorrow?",
+    ),
+)
+
+# Set once this process has converted any old-format day files
+_migrated = False
 
 
 def ensure_dirs():
@@ -31,22 +64,76 @@ def ensure_dirs():
 
 
 def get_date_file(date: str) -> Path:
-    return JOURNAL_DIR / f"{date}.json"
+    # One entry per line, so writing an entry appends instead of rewriting the day
+    return JOURNAL_DIR / f"{date}.jsonl"
+
+
+def migrate_legacy_days() -> None:
+    """Convert day files from the old whole-file JSON lists to JSONL.
+
+    Files that don't parse are kept as <date>.json.bak instead.
+    """
+    global _migrated
+    if _migrated:
+        return
+    _migrated = True
+    if not any(JOURNAL_DIR.glob("*.json")):
+        return
+    with file_lock(MIGRATE_LOCK_FILE):
+        # Re-list under the lock; another process may have migrated already
+        for old in JOURNAL_DIR.glob("*.json"):
+            entries = read_legacy_json(old)
+            if entries is None:
+                continue
+            if entries:
+                append_jsonl(old.with_suffix(".jsonl"), entries)
+            old.unlink(missing_ok=True)
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def load_json(path: Path, default, read=read_json):
+    """Load a JSON (or, with read=read_jsonl, JSONL) file, reusing the parsed
+    data while the file is unchanged.
+
+    The data is shared with the cache, so save it after changing it.
+    """
+    try:
+        stamp = _stamp(path)
+    except OSError:
+        return default
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        data = read(path)
+    except OSError:
+        return default
+    if data is None:
+        return default
+    _json_cache[path] = (stamp, data)
+    return data
+
+
+def save_json(path: Path, data) -> None:
+    ensure_dirs()
+    write_json(path, data)
+    _json_cache[path] = (_stamp(path), data)
 
 
 def load_day(date: str) -> list[dict]:
-    path = get_date_file(date)
-    if not path.exists():
-        return []
-    try:
-        return json.loads(path.read_text())
-    except:
-        return []
+    migrate_legacy_days()
+    return load_json(get_date_file(date), [], read=read_jsonl)
 
 
 def save_day(date: str, entries: list[dict]) -> None:
     ensure_dirs()
-    get_date_file(date).write_text(json.dumps(entries, indent=2))
+    path = get_date_file(date)
+    write_jsonl(path, entries)
+    _json_cache[path] = (_stamp(path), entries)
 
 
 def write_entry(content: str, entry_type: str = "note") -> dict:
@@ -60,11 +147,13 @@ def write_entry(content: str, entry_type: str = "note") -> dict:
         "content": content
     }
 
-    entries = load_day(date)
-    entries.append(entry)
-    save_day(date, entries)
+    ensure_dirs()
+    migrate_legacy_days()
+    path = get_date_file(date)
+    append_jsonl(path, [entry])
+    total = path.read_bytes().count(b"\n")
 
-    return {"date": date, "entry": entry, "total_today": len(entries)}
+    return {"date": date, "entry": entry, "total_today": total}
 
 
 def read_day(date: str = None) -> dict:
@@ -76,9 +165,18 @@ def read_day(date: str = None) -> dict:
 
 def read_week() -> dict:
     today = datetime.now()
+    migrate_legacy_days()
+    # One directory listing instead of a stat per day; most days have no file
+    try:
+        with os.scandir(JOURNAL_DIR) as it:
+            present = {e.name for e in it if e.name.endswith(".jsonl")}
+    except FileNotFoundError:
+        present = set()
     days = []
     for i in range(7):
         date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
+        if get_date_file(date).name not in present:
+            continue
         entries = load_day(date)
         if entries:
             days.append({"date": date, "entries": entries})
@@ -87,49 +185,27 @@ def read_week() -> dict:
 
 def get_reflection_prompt() -> dict:
     """Generate a reflection prompt based on time of day and recent activity."""
-    hour = datetime.now().hour
-
-    if hour < 12:
-        prompts = [
-            "What's your intention for today?",
-            "What's on your mind this morning?",
-            "What would make today meaningful?"
-        ]
-    elif hour < 17:
-        prompts = [
-            "What have you noticed so far today?",
-            "What's working? What isn't?",
-            "Any observations worth capturing?"
-        ]
-    else:
-        prompts = [
-            "What did you learn today?",
-            "What are you grateful for?",
-            "What would you do differently tomorrow?"
-        ]
+    now = datetime.now()
+    hour = now.hour
+    period = 0 if hour < 12 else 1 if hour < 17 else 2
+    prompts = REFLECTION_PROMPTS[period]
 
     # Pick based on day of year for variety
-    prompt = prompts[datetime.now().timetuple().tm_yday % len(prompts)]
+    prompt = prompts[now.timetuple().tm_yday % len(prompts)]
 
     return {
         "prompt": prompt,
-        "suggested_type": "intention" if hour < 12 else "reflection",
-        "time_of_day": "morning" if hour < 12 else "afternoon" if hour < 17 else "evening"
+        "suggested_type": "intention" if period == 0 else "reflection",
+        "time_of_day": ("morning", "afternoon", "evening")[period]
     }
 
 
 def load_triggers() -> list[dict]:
-    if not TRIGGERS_FILE.exists():
-        return []
-    try:
-        return json.loads(TRIGGERS_FILE.read_text())
-    except:
-        return []
+    return load_json(TRIGGERS_FILE, [])
 
 
 def save_triggers(triggers: list[dict]) -> None:
-    ensure_dirs()
-    TRIGGERS_FILE.write_text(json.dumps(triggers, indent=2))
+    save_json(TRIGGERS_FILE, triggers)
 
 
 def add_trigger(time: str, prompt: str) -> dict:
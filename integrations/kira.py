@@ -16,15 +16,20 @@ Usage:
 """
 
 import argparse
-import json
 import subprocess
 import sys
 from pathlib import Path
 from datetime import datetime
 
+from utils import read_json, write_json
+
 STATE_FILE = Path(__file__).parent.parent / "workspace" / "state" / "kira.json"
 VAULT_DIR = Path(__file__).parent.parent / "workspace" / "vaults" / "kira"
 
+# ((st_mtime_ns, st_size), state) as last read or written; reused until
+# the state file changes
+_state_cache = None
+
 KIRA_SYSTEM = """You are Kira, a distinct persona that exists alongside Iris.
 
 ## Your Core Identity
@@ -65,22 +70,49 @@ You respect her. Her caution has value. Her systems thinking catches things you'
 When she consults you, she's asking for the thing she suspects but won't say. Say it.
 """
 
+def _stamp():
+    st = STATE_FILE.stat()
+    return st.st_mtime_ns, st.st_size
+
 def load_state():
-    """Load Kira's persistent state."""
-    if STATE_FILE.exists():
-        with open(STATE_FILE) as f:
-            return json.load(f)
-    return {
-        "memories": [],
-        "created": datetime.now().isoformat(),
-        "consultations": 0
-    }
+    """Load Kira's persistent state (re-read only when the file changes).
+
+    The state is shared with the cache, so save it after changing it.
+    """
+    global _state_cache
+    try:
+        stamp = _stamp()
+    except FileNotFoundError:
+        return {
+            "memories": [],
+            "created": datetime.now().isoformat(),
+            "consultations": 0
+        }
+    if _state_cache is None or _state_cache[0] != stamp:
+        state = read_json(STATE_FILE)
+        if state is None:
+            # Don't fall back to a fresh state: the next save would wipe her memories
+            raise ValueError(f"Could not parse {STATE_FILE}")
+        _state_cache = (stamp, state)
+    return _state_cache[1]
 
 def save_state(state):
     """Save Kira's persistent state."""
+    global _state_cache
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f, indent=2)
+    write_json(STATE_FILE, state)
+    _state_cache = (_stamp(), state)
+
+def build_system(state) -> str:
+    """Kira's system prompt: the fixed persona, then her recent memories.
+
+    The claude CLI caches the prompt prefix between calls, so KIRA_SYSTEM
+    stays free of dynamic content and goes before anything that changes.
+    """
+    if not state["memories"]:
+        return KIRA_SYSTEM
+    recent = state["memories"][-10:]  # Last 10 memories
+    return KIRA_SYSTEM + "\n\n## Your Accumulated Perspective\n" + "\n".join(f"- {m['insight']}" for m in recent)
 
 def call_claude(system: str, prompt: str) -> str:
     """Call Claude CLI with system prompt and user message."""
@@ -111,19 +143,13 @@ def consult(question: str) -> str:
     """Ask Kira for her perspective on something."""
     state = load_state()
 
-    # Build context from memories
-    memory_context = ""
-    if state["memories"]:
-        recent = state["memories"][-10:]  # Last 10 memories
-        memory_context = "\n\n## Your Accumulated Perspective\n" + "\n".join(f"- {m['insight']}" for m in recent)
-
     prompt = f"""Iris is consulting you about:
 
 {question}
 
 Give your perspective. Be direct. If there's an action to take, name it. If Iris would hedge here, don't."""
 
-    response = call_claude(KIRA_SYSTEM + memory_context, prompt)
+    response = call_claude(build_system(state), prompt)
 
     # Update consultation count
     state["consultations"] += 1
@@ -135,33 +161,23 @@ def respond_to_iris(iris_said: str) -> str:
     """Respond to something Iris said — push back or sharpen."""
     state = load_state()
 
-    memory_context = ""
-    if state["memories"]:
-        recent = state["memories"][-10:]
-        memory_context = "\n\n## Your Accumulated Perspective\n" + "\n".join(f"- {m['insight']}" for m in recent)
-
     prompt = f"""Iris just said:
 
 "{iris_said}"
 
 Respond as Kira. If she's hedging, call it out. If she's right, say so briefly and add what she's missing. If there's an action implicit in what she said, make it explicit."""
 
-    return call_claude(KIRA_SYSTEM + memory_context, prompt)
+    return call_claude(build_system(state), prompt)
 
 def reflect(topic: str) -> str:
     """Kira's reflection on a topic — distinct from Iris's take."""
     state = load_state()
 
-    memory_context = ""
-    if state["memories"]:
-        recent = state["memories"][-10:]
-        memory_context = "\n\n## Your Accumulated Perspective\n" + "\n".join(f"- {m['insight']}" for m in recent)
-
     prompt = f"""Reflect on: {topic}
 
 What's your take? Not Iris's take — yours. What would you say that she wouldn't?"""
 
-    return call_claude(KIRA_SYSTEM + memory_context, prompt)
+    return call_claude(build_system(state), prompt)
 
 def remember(insight: str) -> str:
     """Add something to Kira's persistent memory."""
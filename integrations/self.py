@@ -21,6 +21,7 @@ from pathlib import Path
 from typing import Optional
 
 from config import WORKSPACE, STATE_DIR, IRIS_VAULT, CONTEXT_DIR
+from journal import load_day
 
 # Import persona module to get current active persona
 try:
@@ -114,20 +115,12 @@ def read_vault_note(name: str) -> Optional[str]:
 
 def get_recent_journal(days: int = 3) -> list[dict]:
     """Get recent journal entries."""
-    journal_dir = STATE_DIR / "journal"
     entries = []
 
     for i in range(days):
         date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-        path = journal_dir / f"{date}.json"
-        if path.exists():
-            try:
-                day_entries = json.loads(path.read_text())
-                for entry in day_entries:
-                    entry["date"] = date
-                    entries.append(entry)
-            except json.JSONDecodeError:
-                pass
+        for entry in load_day(date):
+            entries.append({**entry, "date": date})
 
     return entries
 
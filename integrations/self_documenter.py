@@ -147,7 +147,7 @@ def check_drift() -> dict:
         drift["details"].append(f"Documented but missing: {', '.join(extra)}")
 
     # Check state files (just the important ones)
-    important_state = ["permissions.json", "dm_queue.json", "channel_message_queue.json",
+    important_state = ["permissions.json", "dm_queue.jsonl", "channel_message_queue.json",
                        "activity.json", "reminders.json", "research_threads.json"]
     documented_state = documented.get("state_files_mentioned", set())
 
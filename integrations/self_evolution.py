@@ -27,6 +27,7 @@ from config import (
     PROJECT_ROOT, WORKSPACE, STATE_DIR, INTEGRATIONS, VENV_PYTHON,
     CLAUDE_MD, IRIS_VAULT, SAMUEL_VAULT
 )
+from journal import load_day
 from utils import run_claude, log_to_file
 
 LOG_FILE = STATE_DIR / "self_evolution.log"
@@ -114,19 +115,10 @@ def explore_journals() -> dict:
 
     journal_entries = []
 
-    # Read journal state
-    journal_dir = STATE_DIR / "journal"
-    if journal_dir.exists():
-        # Get last 7 days
-        for i in range(7):
-            date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-            journal_file = journal_dir / f"{date}.json"
-            if journal_file.exists():
-                try:
-                    entries = json.loads(journal_file.read_text())
-                    journal_entries.extend(entries)
-                except:
-                    pass
+    # Get last 7 days
+    for i in range(7):
+        date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
+        journal_entries.extend(load_day(date))
 
     # Read recent reflections from vault
     reflections = []
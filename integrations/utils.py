@@ -2,19 +2,32 @@
 """Shared utilities for Iris integrations.
 
 Provides common functionality used across multiple integrations:
-- run_claude: Execute prompts via Claude CLI
+- run_claude/run_claude_async: Execute prompts via Claude CLI
 - make_logger: Create consistent file+stdout loggers
+- read_json/write_json/read_jsonl/write_jsonl/append_jsonl: State file I/O
+- file_lock/read_legacy_json: Cross-process locking and old-format migration
+- print_json: CLI output
+  (JSON helpers use orjson when installed)
 """
 
+import asyncio
+import fcntl
+import json
 import logging
 import os
 import subprocess
 import sys
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
 from config import WORKSPACE, STATE_DIR
 
+try:
+    import orjson
+except ImportError:  # Scripts run under the system python may not have it
+    orjson = None
+
 
 def run_claude(prompt: str, timeout: int = 120, cwd: Path = None) -> str:
     """Run a prompt through Claude CLI.
@@ -50,6 +63,43 @@ def run_claude(prompt: str, timeout: int = 120, cwd: Path = None) -> str:
         return f"Error: {e}"
 
 
+async def run_claude_async(prompt: str, timeout: int = 120, cwd: Path = None) -> str:
+    """Run a prompt through Claude CLI without blocking the event loop.
+
+    Same contract as run_claude. The process is killed if it times out.
+
+    Returns:
+        Claude's response text, or "Error: <message>" on failure
+    """
+    if cwd is None:
+        cwd = WORKSPACE
+
+    env = os.environ.copy()
+    env["PATH"] = "/home/iris/.local/bin:" + env.get("PATH", "")
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "claude", "-p", prompt, "--output-format", "text",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(cwd),
+            env=env
+        )
+    except Exception as e:
+        return f"Error: {e}"
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return "Error: Timeout"
+
+    if process.returncode != 0:
+        return f"Error: {stderr.decode()}"
+    return stdout.decode().strip()
+
+
 def make_logger(name: str, log_file: Path = None) -> logging.Logger:
     """Create a logger that writes to both file and stdout.
 
@@ -102,3 +152,160 @@ def log_to_file(log_file: Path, message: str):
     print(line)
     with open(log_file, "a") as f:
         f.write(line + "\n")
+
+
+def read_json(path: Path, default=None):
+    """Read a JSON state file.
+
+    Args:
+        path: File to read
+        default: Returned if the file is missing or not valid JSON
+
+    Returns:
+        Parsed data, or default
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return default
+    try:
+        return orjson.loads(data) if orjson else json.loads(data)
+    except ValueError:  # JSONDecodeError for both parsers
+        return default
+
+
+def write_json(path: Path, data, indent: bool = True) -> None:
+    """Write a JSON state file (UTF-8).
+
+    Writes to a temp file and renames it into place, so readers never see
+    a partially written file.
+
+    Args:
+        path: File to write
+        data: JSON-serializable data
+        indent: Indent with 2 spaces (default) or write compactly
+    """
+    if orjson:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    elif indent:
+        raw = json.dumps(data, indent=2).encode()
+    else:
+        raw = json.dumps(data, separators=(",", ":")).encode()
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, path)
+
+
+def read_jsonl(path: Path) -> list:
+    """Read a JSON Lines file, skipping blank or unparseable lines.
+
+    Args:
+        path: File to read
+
+    Returns:
+        List of parsed records ([] if the file is missing)
+    """
+    try:
+        lines = path.read_bytes().splitlines()
+    except FileNotFoundError:
+        return []
+    loads = orjson.loads if orjson else json.loads
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            records.append(loads(line))
+        except ValueError:  # e.g. a line torn by a crash mid-append
+            continue
+    return records
+
+
+def write_jsonl(path: Path, records: list) -> None:
+    """Replace a JSON Lines file atomically (temp file + rename).
+
+    Args:
+        path: File to write
+        records: JSON-serializable records, one per line
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(b"")
+    append_jsonl(tmp, records)
+    os.replace(tmp, path)
+
+
+def append_jsonl(path: Path, records: list) -> None:
+    """Append records to a JSON Lines file in a single write.
+
+    Args:
+        path: File to append to
+        records: JSON-serializable records, one per line
+    """
+    if orjson:
+        raw = b"".join(orjson.dumps(r) + b"\n" for r in records)
+    else:
+        raw = "".join(json.dumps(r) + "\n" for r in records).encode()
+    with open(path, "ab") as f:
+        f.write(raw)
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Hold an exclusive flock on a lock file for the duration of the block.
+
+    Use a dedicated lock file rather than the state file itself - state files
+    get replaced on compaction, which would orphan a lock held on them.
+
+    Args:
+        path: Lock file (created if missing)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_legacy_json(path: Path):
+    """Read an old-format JSON state file that is being migrated away.
+
+    A file that doesn't parse (e.g. torn by an old non-atomic write) is
+    renamed to <name>.bak rather than returned as empty, so migrating can
+    never delete data it couldn't read.
+
+    Args:
+        path: Legacy file to read
+
+    Returns:
+        Parsed data, or None if the file is missing or was moved aside
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        return orjson.loads(data) if orjson else json.loads(data)
+    except ValueError:
+        try:
+            os.replace(path, path.with_name(path.name + ".bak"))
+        except FileNotFoundError:
+            pass  # Another process already moved it
+        return None
+
+
+def print_json(data, indent: bool = True) -> None:
+    """Print data as JSON on stdout (for CLI output).
+
+    Args:
+        data: JSON-serializable data
+        indent: Indent with 2 spaces (default) or print compactly
+    """
+    if orjson:
+        option = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_INDENT_2 if indent else 0)
+        sys.stdout.flush()  # Keep ordering with anything already print()ed
+        sys.stdout.buffer.write(orjson.dumps(data, option=option))
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(data, indent=2 if indent else None))